@@ -1 +1,3 @@
+__version__ = "0.0.7"
+
 __all__ = ["core", "utils"]
@@ -7,9 +7,10 @@ import logging as log
 from timeit import default_timer as timer
 
 from hypernetworks.core.Hypernetwork import Hypernetwork
-from hypernetworks.utils.HTCompiler import load_parser, compile_hn, load_ht
+from hypernetworks.utils.HTCompiler import load_parser, compile_hn, compile_stream, compile_files, load_ht
 from hypernetworks.utils.HTGraph import to_graph
 from hypernetworks.utils.HTInOut import JSON, YAML, load_Hn, save_Hn
+from hypernetworks.utils.HTMemory import format_memory_report
 from hypernetworks.utils.HTSimplicalComplex import qanalysis_of_simplical_complex, gen_simplical_complex, \
     simplical_complex_to_graph
 
@@ -17,6 +18,11 @@ logger = log.StreamHandler(sys.stdout)
 log.basicConfig(level=log.DEBUG, handlers=[logger])
 
 
+def _progress(p):
+    log.debug("Compiled {:,} lines, {:,} statements, {:,} Hs in {:.1f}s".format(
+        p.lines, p.statements, p.hypersimplices, p.elapsed))
+
+
 def qa(sc, parents, children):
     log.debug("Parents: " + str(parents))
     log.debug("Children: " + str(children))
@@ -64,28 +70,51 @@ def qa(sc, parents, children):
 @click.option("--save", "-s", help="Save JSON/YAML format.")
 @click.option("--string", "-g", is_flag=True, help="Output the Hn string.")
 @click.option("--atomic", "-a", is_flag=True, help="Search based on mereonomic relations.")
+@click.option("--memory", "-m", is_flag=True, help="Report the memory used by the Hn before and after loading.")
+@click.option("--stream", is_flag=True, help="Compile each file a chunk of statements at a time.")
+@click.option("--jobs", default=1, help="The number of processes to compile the files with.")
+@click.option("--cache", help="A directory to cache compiled files in.")
 def run(ht, name, nograph, dir, output, time, r, qanalysis, levelgraph, level,
-        incparent, parentonly, json, yaml, save, string, atomic):
+        incparent, parentonly, json, yaml, save, string, atomic, memory, stream, jobs, cache):
     start = timer()
     hn = Hypernetwork()
-    parser = load_parser()
+    parser = load_parser(inline=True)
+
+    if memory:
+        print("Memory before loading:")
+        print(format_memory_report(hn.memory_report()))
+
+    def _compile(files):
+        if jobs > 1:
+            compile_files(hn, files, max_workers=jobs, stream=stream, cache=cache)
+            return
+
+        for file in files:
+            if stream:
+                with open(file, 'r') as f:
+                    compile_stream(hn, f, parser=parser, progress=_progress)
+            else:
+                compile_hn(hn, parser, load_ht(file), cache=cache)
+    # End _compile
 
     if save:
-        for file in ht.split(','):
-            compile_hn(hn, parser, load_ht(file))
+        _compile(ht.split(','))
     else:
         if json:
             hn = load_Hn(ht, type=JSON)
         elif yaml:
             hn = load_Hn(ht, type=YAML)
         else:
-            for file in ht.split(','):
-                compile_hn(hn, parser, load_ht(file))
+            _compile(ht.split(','))
 
     if time:
         end = timer()
         log.debug("Parsing: " + str(end - start))
 
+    if memory:
+        print("Memory after loading:")
+        print(format_memory_report(hn.memory_report()))
+
     if not nograph:
         to_graph(hn, direction=dir, fname=output + name, R=r, N=level, A=atomic, show_level=False)
 
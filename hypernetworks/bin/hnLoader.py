@@ -13,7 +13,7 @@ from hypernetworks.utils.HTMongo import load_Hn_into_mongo
 @click.argument('fname')
 def hn_loader(name, fname):
     hn = Hypernetwork(name=name)
-    parser = load_parser()
+    parser = load_parser(inline=True)
 
     compile_hn(hn, parser, load_Hn(fname))
 
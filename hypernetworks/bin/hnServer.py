@@ -30,7 +30,7 @@ def generate_graph():
 
     if hn_str:
         hn = Hypernetwork()
-        compile_hn(hn, load_parser(), hn_str)
+        compile_hn(hn, load_parser(inline=True), hn_str)
 
         if hn:
             response = app.response_class(
@@ -56,7 +56,7 @@ def compile():
 
     if hn_str:
         hn = Hypernetwork()
-        compile_hn(hn, load_parser(), hn_str)
+        compile_hn(hn, load_parser(inline=True), hn_str)
 
         if hn:
             response = app.response_class(
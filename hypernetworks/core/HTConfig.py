@@ -7,3 +7,6 @@ hs_expand_R = True
 hs_replace_same_vertex = False
 
 # TODO add load yaml to set these config parameters.
+
+# The memory bound, in bytes, of the derived results memoised for each Hn.
+memo_max_bytes = 64 * 1024 * 1024
@@ -30,4 +30,14 @@ class HnImmutableType(HnErrors):
 
 
 class HnParseError(HnErrors):
-    pass
\ No newline at end of file
+    pass
+
+
+class HnLockError(HnErrors):
+    """A read lock cannot be upgraded to a write lock"""
+    pass
+
+
+class HnJournalError(HnErrors):
+    """The journal no longer holds the changes asked for"""
+    pass
@@ -0,0 +1,197 @@
+# Secondary indexes over the Hypersimplices of a Hypernetwork.
+#   Each index maps a value to the vertices holding it, dicts are used for the
+#   postings so that a vertex can be removed in constant time.  A vertex is moved to the
+#   end of a posting when it is reindexed, Hypernetwork.search puts its results back into
+#   the order of the Hn.
+import re
+
+from hypernetworks.core.Hypersimplex import BETA, EMPTY_LIST, split_special
+
+FIELDS = ["hstype", "R", "N", "t"]
+
+
+def simplex_key(ids, flags=EMPTY_LIST):
+    # Flagged references are folded into negative keys so they stay apart from plain ones.
+    if flags:
+        return tuple(~(_id << 3 | flag) if flag else _id for _id, flag in zip(ids, flags))
+
+    return tuple(ids)
+
+
+def content_key(hstype, ids, flags=EMPTY_LIST):
+    # BETAs are unordered so are keyed on the set of their vertices.
+    if hstype == BETA:
+        return hstype, frozenset(simplex_key(ids, flags))
+
+    return hstype, simplex_key(ids, flags)
+
+
+class HnIndex:
+    def __init__(self, symbols):
+        self._symbols = symbols
+        self._postings = {field: {} for field in FIELDS}
+        self._B = {}
+        # The content of every Hs with a simplex, whatever its hstype, as search matches
+        #   the simplex alone.  A simplex in order, and as a set for the BETA search.
+        self._content = {}
+        self._sets = {}
+        self._members = {}
+
+    @staticmethod
+    def _post(postings, key, vertex):
+        if key in postings:
+            postings[key][vertex] = None
+        else:
+            postings[key] = {vertex: None}
+
+    @staticmethod
+    def _unpost(postings, key, vertex):
+        if key in postings:
+            postings[key].pop(vertex, None)
+
+            if not postings[key]:
+                del postings[key]
+
+    def add(self, hs):
+        vertex = hs.vertex
+
+        for field in FIELDS:
+            self._post(self._postings[field], getattr(hs, field), vertex)
+
+        for b in hs.B:
+            self._post(self._B, b, vertex)
+
+        self._add_content(vertex, hs.simplex_ids, hs.simplex_flags)
+
+    def remove(self, hs):
+        vertex = hs.vertex
+
+        for field in FIELDS:
+            self._unpost(self._postings[field], getattr(hs, field), vertex)
+
+        for b in hs.B:
+            self._unpost(self._B, b, vertex)
+
+        self._remove_content(vertex, hs.simplex_ids, hs.simplex_flags)
+
+    def _add_content(self, vertex, ids, flags):
+        if ids:
+            key = simplex_key(ids, flags)
+            self._post(self._content, key, vertex)
+            self._sets[vertex] = frozenset(key)
+
+            for v in self._sets[vertex]:
+                self._post(self._members, v, vertex)
+
+    def _remove_content(self, vertex, ids, flags):
+        if ids:
+            self._unpost(self._content, simplex_key(ids, flags), vertex)
+
+            for v in self._sets.pop(vertex, ()):
+                self._unpost(self._members, v, vertex)
+
+    def update(self, hs, field, old, new):
+        vertex = hs.vertex
+
+        # The simplex is given as its (ids, flags) arrays.
+        if field == "simplex":
+            self._remove_content(vertex, *old)
+            self._add_content(vertex, *new)
+
+        if field == "B":
+            for b in old:
+                self._unpost(self._B, b, vertex)
+            for b in new:
+                self._post(self._B, b, vertex)
+
+        elif field in self._postings:
+            self._unpost(self._postings[field], old, vertex)
+            self._post(self._postings[field], new, vertex)
+
+    def clear(self):
+        for field in FIELDS:
+            self._postings[field].clear()
+
+        self._B.clear()
+        self._content.clear()
+        self._sets.clear()
+        self._members.clear()
+
+    @staticmethod
+    def _union(postings):
+        if len(postings) == 1:
+            return postings[0]
+
+        res = {}
+        for posting in postings:
+            res.update(posting)
+
+        return res
+
+    def hstype(self, hstype):
+        return self._postings["hstype"].get(hstype, {})
+
+    def t(self, t):
+        return self._postings["t"].get(t, {})
+
+    def distinct(self, field):
+        return len(self._postings[field])
+
+    def postings(self, field, pattern):
+        # Only the distinct values need to be tested against the pattern,
+        #   R is searched and N is matched from the start.
+        test = pattern.search if field == "R" else pattern.match
+        return [p for k, p in self._postings[field].items() if test(k)]
+
+    def B_postings(self, B):
+        return [self._B[b] for b in B if b in self._B]
+
+    def R(self, R):
+        return self._union(self.postings("R", re.compile(R)))
+
+    def N(self, N):
+        return self._union(self.postings("N", re.compile(N)))
+
+    def B(self, B):
+        return self._union(self.B_postings(B))
+
+    def simplex(self, hstype, simplex):
+        # hstype only says how the simplex is matched, a Hs of any hstype can be found.
+        # A dropped entry is never found, so an ALPHA with one has no match.
+        entries = [split_special(v) for v in simplex]
+        ids = [self._symbols.get(entry[0]) if entry else None for entry in entries]
+        flags = [entry[1] if entry else 0 for entry in entries]
+
+        if hstype != BETA:
+            if None in ids:
+                return {}
+
+            return self._content.get(simplex_key(ids, flags if any(flags) else EMPTY_LIST), {})
+
+        found = [i for i, _id in enumerate(ids) if _id is not None]
+        key = frozenset(simplex_key([ids[i] for i in found], [flags[i] for i in found] if any(flags) else EMPTY_LIST))
+
+        # As a BETA a Hs matches when all of its vertices are found in the simplex.
+        res = {}
+        seen = set()
+
+        for v in key:
+            for vertex in self._members.get(v, {}):
+                if vertex not in seen:
+                    seen.add(vertex)
+
+                    if self._sets[vertex].issubset(key):
+                        res[vertex] = None
+
+        return res
+
+
+def intersect(postings):
+    # Walk the smallest posting, checking membership in the rest.
+    if not postings:
+        return []
+
+    postings = sorted(postings, key=len)
+    smallest, rest = postings[0], postings[1:]
+
+    return [v for v in smallest if all(v in p for p in rest)]
@@ -0,0 +1,67 @@
+# An append-only journal of the changes made to a Hypernetwork.
+#   Each change is given a token, increasing from 1, a consumer holds on to the token of
+#   the last change it saw and asks for the changes since.  Subscribers are called with
+#   each change as it is made.
+import logging as log
+
+from collections import deque, namedtuple
+from itertools import islice
+
+from hypernetworks.core.HTErrors import HnJournalError
+
+# Change operations
+ADD = "add"
+UPDATE = "update"
+DELETE = "delete"
+LINK = "link"
+UNLINK = "unlink"
+
+HnChange = namedtuple("HnChange", ["token", "op", "vertex", "field", "old", "new"])
+
+
+class HnJournal:
+    def __init__(self, maxlen=None):
+        self._changes = deque(maxlen=maxlen)
+        self._token = 0
+        self._subscribers = []
+
+    @property
+    def token(self):
+        # The token of the latest change, 0 before anything has changed.
+        return self._token
+
+    def record(self, op, vertex, field=None, old=None, new=None):
+        self._token += 1
+        change = HnChange(self._token, op, vertex, field, old, new)
+        self._changes.append(change)
+
+        for subscriber in self._subscribers:
+            subscriber(change)
+
+    def changes_since(self, token=0):
+        first = self._token - len(self._changes)
+
+        # A bounded journal may no longer hold what was changed after the token.
+        if token < first:
+            log.error("changes_since: the changes since token " + str(token) + " are no longer held.")
+            raise HnJournalError
+
+        return list(islice(self._changes, token - first, None))
+
+    def subscribe(self, subscriber):
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.remove(subscriber)
+
+    # Subscribers are left behind when a Hn is copied.
+    def __getstate__(self):
+        return {"_changes": self._changes, "_token": self._token}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._subscribers = []
+
+    def __len__(self):
+        return len(self._changes)
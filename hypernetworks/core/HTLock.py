@@ -0,0 +1,136 @@
+# Locking for Hypernetworks shared between threads.
+#   Any number of readers can hold the lock at once while writers have it to themselves,
+#   waiting writers hold back new readers so they are not starved.  Both sides are
+#   re-entrant, and a writer may also read, but a reader cannot upgrade to a writer.
+import logging as log
+import threading
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+from hypernetworks.core.HTErrors import HnLockError
+
+
+class HnRWLock:
+    locking = True
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}
+        self._writer = None
+        self._writes = 0
+        self._waiting = 0
+
+    # Copies of a Hn start unlocked.
+    def __getstate__(self):
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def acquire_read(self):
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._waiting:
+                    self._cond.wait()
+
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._readers[me] == 1:
+                del self._readers[me]
+
+                if not self._readers:
+                    self._cond.notify_all()
+            else:
+                self._readers[me] -= 1
+
+    def acquire_write(self):
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._writer == me:
+                self._writes += 1
+                return
+
+            if me in self._readers:
+                log.error("acquire_write: cannot upgrade a read lock.")
+                raise HnLockError
+
+            self._waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+
+            self._writer = me
+            self._writes = 1
+
+    def release_write(self):
+        with self._cond:
+            self._writes -= 1
+
+            if self._writes == 0:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class HnNoLock:
+    # Used when a Hn is not shared between threads, so locking costs next to nothing.
+    locking = False
+    _context = nullcontext()
+
+    def read(self):
+        return self._context
+
+    def write(self):
+        return self._context
+
+
+def reads(func):
+    # For methods of a Hn, or functions taking the Hn as their first argument.
+    @wraps(func)
+    def _reads(hn, *args, **kwargs):
+        if not hn.lock.locking:
+            return func(hn, *args, **kwargs)
+
+        with hn.lock.read():
+            return func(hn, *args, **kwargs)
+    # End _reads
+
+    return _reads
+
+
+def writes(func):
+    @wraps(func)
+    def _writes(hn, *args, **kwargs):
+        if not hn.lock.locking:
+            return func(hn, *args, **kwargs)
+
+        with hn.lock.write():
+            return func(hn, *args, **kwargs)
+    # End _writes
+
+    return _writes
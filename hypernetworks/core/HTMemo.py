@@ -0,0 +1,129 @@
+# Memoisation of results derived from a Hypernetwork.
+#   Results are keyed on the function and its arguments and are only valid for the
+#   generation of the Hn they were derived at, every mutation of the Hn moves its
+#   generation on.  Entries are evicted least recently used first to keep within a
+#   memory bound.
+import sys
+import threading
+
+from collections import OrderedDict
+from functools import wraps
+
+from hypernetworks.core.HTConfig import memo_max_bytes
+
+
+def sizeof(obj, seen=None):
+    # An estimate of the memory held by a result, shared objects are only counted once.
+    #   Objects already in seen are not counted again, so it can be shared between calls.
+    if seen is None:
+        seen = set()
+
+    size = 0
+    work = [obj]
+
+    while work:
+        o = work.pop()
+        if id(o) in seen:
+            continue
+
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            work.extend(o.keys())
+            work.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            work.extend(o)
+        elif hasattr(o, "__dict__"):
+            work.append(o.__dict__)
+
+    return size
+
+
+def _fresh(value):
+    # Callers are given their own copy of a memoised result, so they are free to change it.
+    if isinstance(value, tuple):
+        return tuple(_fresh(v) for v in value)
+
+    if hasattr(value, "copy"):
+        return value.copy()
+
+    return value
+
+
+class HnMemo:
+    def __init__(self, max_bytes=memo_max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._generation = None
+        self._mutex = threading.Lock()
+
+    def get(self, key, generation, derive):
+        # Readers of a shared Hn can get here together, the result is derived outside the mutex.
+        with self._mutex:
+            # Anything held from an earlier generation is stale.
+            if generation != self._generation:
+                self.clear()
+                self._generation = generation
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+                return _fresh(self._entries[key][0])
+
+            self.misses += 1
+
+        value = derive()
+        size = sizeof(value)
+
+        with self._mutex:
+            stored = size <= self.max_bytes and generation == self._generation
+            if stored:
+                self._entries[key] = (value, size)
+                self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, _size) = self._entries.popitem(last=False)
+                self._bytes -= _size
+
+        return _fresh(value) if stored else value
+
+    # Copies of a Hn start with an empty memo.
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def memoised(func):
+    # For functions taking the Hn as their first argument, results are held in the Hn's memo.
+    @wraps(func)
+    def _memoised(hn, *args, **kwargs):
+        key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+        try:
+            hash(key)
+        except TypeError:
+            return func(hn, *args, **kwargs)
+
+        with hn.lock.read():
+            return hn.memo.get(key, hn.generation, lambda: func(hn, *args, **kwargs))
+    # End _memoised
+
+    return _memoised
@@ -0,0 +1,123 @@
+# Union and intersection of Hypernetworks.
+#   Hypersimplices are reconciled by vertex name and simplex, only conflicting
+#   definitions, those that need BETA merging or ALPHA splitting, go through insert.
+from hypernetworks.core.HTIndex import content_key
+from hypernetworks.core.Hypersimplex import NONE, VERTEX, BETA, SPECIAL_KEYS
+
+SPECIAL_FLAGS = {flag: key for key, flag in SPECIAL_KEYS.items()}
+
+
+def merge(hn, other):
+    # Wholes that were added directly and still need their parts linked.
+    wholes = []
+
+    with hn.batch():
+        for name, hs in other.hypernetwork.items():
+            mine = hn.hypernetwork.get(name)
+            B = set(hs.B) if hs.B else None
+            C = list(hs.C) if hs.C else None
+
+            if mine is None:
+                _copy(hn, hs)
+                wholes.append(name)
+
+            elif not hs.simplex_ids:
+                hn.update(name, R=hs.R, t=hs.t, C=C, B=B, N=hs.N, psi=hs.psi)
+
+            elif not mine.simplex_ids or (mine.hstype == hs.hstype and mine.entries() == hs.entries()):
+                hn.update(name, hstype=hs.hstype if not mine.simplex_ids else NONE,
+                          simplex=hs.entries() if not mine.simplex_ids else None,
+                          R=hs.R, t=hs.t, C=C, B=B, N=hs.N, psi=hs.psi)
+                wholes.append(name)
+
+            else:
+                hn.insert(name, hstype=hs.hstype, simplex=_parsed(hs), R=hs.R, t=hs.t, C=C, B=B,
+                          N=hs.N, psi=hs.psi)
+
+        _link(hn, wholes)
+
+        for R, where in other.relations.items():
+            if not hn.relations.get(R):
+                hn.relations[R] = where
+
+    return hn
+
+
+def intersection(hn, other, inc_whole=False):
+    res = type(hn)()
+    wholes = []
+
+    # A vertex in both is kept, its simplex only when both agree on it.
+    for name, hs in hn.hypernetwork.items():
+        theirs = other.hypernetwork.get(name)
+        if theirs is None:
+            continue
+
+        if hs.simplex_ids and content_key(hs.hstype, hs.entries()) == content_key(theirs.hstype, theirs.entries()):
+            _copy(res, hs)
+            wholes.append(name)
+        else:
+            _copy(res, hs, leaf=True)
+
+    if inc_whole:
+        # One pass up through the other's partOf from every shared vertex, noting
+        #   which parts each whole was reached from.
+        reached = {}
+        work = list(res.hypernetwork)
+        seen = set(work)
+
+        while work:
+            v = work.pop()
+            hs = other.hypernetwork.get(v)
+            if not hs:
+                continue
+
+            for whole in hs.partOf:
+                if whole in reached:
+                    reached[whole][v] = None
+                else:
+                    reached[whole] = {v: None}
+
+                if whole not in seen:
+                    seen.add(whole)
+                    work.append(whole)
+
+        for whole, parts in reached.items():
+            hs = other.hypernetwork.get(whole)
+            if whole in res.hypernetwork or not hs:
+                continue
+
+            # A BETA only keeps the alternatives that were reached.
+            simplex = [v for v in hs.entries() if v[0] in parts] if hs.hstype == BETA else None
+            _copy(res, hs, simplex=simplex)
+            wholes.append(whole)
+
+        # The other parts of a whole are kept as vertices.
+        for whole in wholes:
+            for part in res.hypernetwork[whole].parts:
+                if part not in res.hypernetwork:
+                    hs = other.hypernetwork.get(part)
+                    res.add(part, hstype=hs.hstype if hs and not hs.simplex_ids else VERTEX)
+
+    _link(res, wholes)
+
+    return res
+
+
+def _copy(hn, hs, simplex=None, leaf=False):
+    hn.add(hs.vertex, hstype=VERTEX if leaf and hs.simplex_ids else hs.hstype,
+           simplex=None if leaf else (hs.entries() if simplex is None else simplex),
+           R=hs.R, t=hs.t, C=list(hs.C) if hs.C else None, B=set(hs.B) if hs.B else None,
+           N=hs.N, psi=hs.psi)
+
+
+def _link(hn, wholes):
+    for whole in wholes:
+        for part in hn.hypernetwork[whole].parts:
+            if part in hn.hypernetwork:
+                hn.hypernetwork[part].add_partOf(whole)
+
+
+def _parsed(hs):
+    # The simplex in the form the parser gives it to insert, flagged entries as dicts.
+    return [{SPECIAL_FLAGS[flags]: v} if flags else v for v, flags in hs.entries()]
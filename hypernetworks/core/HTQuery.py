@@ -0,0 +1,134 @@
+# Lazy queries over the indexes of a Hypernetwork.
+#   The most selective predicate drives the query, the others are checked against
+#   each candidate Hs, so a query can stop as soon as it has enough results.
+import re
+
+from hypernetworks.core.Hypersimplex import NONE
+
+
+class HnQuery:
+    def __init__(self, hn, vertex="", hstype=NONE, R="", t=-1, B=None, N="", limit=None):
+        self._hn = hn
+        self._limit = limit
+        self._drive = None
+        self._checks = []
+
+        with hn.lock.read():
+            self._plan(vertex, hstype, R, t, B, N)
+
+    def _plan(self, vertex, hstype, R, t, B, N):
+        index = self._hn.index
+
+        # Exact predicates, their postings are a dict lookup away.
+        exact = []
+
+        if vertex != "":
+            exact.append(([{vertex: None}] if vertex in self._hn.hypernetwork else [],
+                          lambda hs: hs.vertex == vertex))
+
+        if hstype != NONE:
+            exact.append(([index.hstype(hstype)], lambda hs: hs.hstype == hstype))
+
+        if t >= 0:
+            exact.append(([index.t(t)], lambda hs: hs.t == t))
+
+        if B:
+            exact.append((index.B_postings(B), lambda hs: not hs.B.isdisjoint(B)))
+
+        # Pattern predicates, compiled once and only resolved against the distinct
+        #   values in the index when that could beat the best exact posting.
+        patterns = []
+
+        if R:
+            R = re.compile(R)
+            patterns.append(("R", R, lambda hs: R.search(hs.R)))
+
+        if N:
+            N = re.compile(N)
+            patterns.append(("N", N, lambda hs: N.match(hs.N)))
+
+        candidates = [(sum(len(p) for p in postings), postings, check) for postings, check in exact]
+        best = min(candidates, key=lambda c: c[0])[0] if candidates else None
+
+        for field, pattern, check in patterns:
+            if best is None or index.distinct(field) < best:
+                postings = index.postings(field, pattern)
+                candidates.append((sum(len(p) for p in postings), postings, check))
+            else:
+                self._checks.append(check)
+
+        if candidates:
+            candidates.sort(key=lambda c: c[0])
+            self._drive = candidates[0][1]
+            self._checks.extend(c[2] for c in candidates[1:])
+
+    def _candidates(self):
+        # The driving postings are copied when iteration starts, so the Hn can be changed
+        #   by the loop consuming the query, as it could be with the list from search.
+        if self._drive is None:
+            yield from list(self._hn.hypernetwork)
+            return
+
+        if len(self._drive) == 1:
+            yield from list(self._drive[0])
+            return
+
+        # Only postings from B can hold a vertex more than once.
+        seen = set()
+        for posting in [list(posting) for posting in self._drive]:
+            for vertex in posting:
+                if vertex not in seen:
+                    seen.add(vertex)
+                    yield vertex
+
+    def __iter__(self):
+        # A Hn shared between threads could change under a lazy query, so its results
+        #   are gathered while the Hn is read locked.
+        if self._hn.thread_safe:
+            with self._hn.lock.read():
+                found = list(self._iter())
+
+            yield from found
+
+        else:
+            yield from self._iter()
+
+    def _iter(self):
+        if self._limit is not None and self._limit <= 0:
+            return
+
+        hypernetwork = self._hn.hypernetwork
+        checks = self._checks
+        found = 0
+
+        for vertex in self._candidates():
+            # Skip a vertex deleted since iteration started.
+            hs = hypernetwork.get(vertex)
+            if hs is None or (checks and not all(check(hs) for check in checks)):
+                continue
+
+            yield vertex
+
+            found += 1
+            if found == self._limit:
+                return
+
+    def exists(self):
+        for _ in self:
+            return True
+
+        return False
+
+    def count(self):
+        if not self._checks and self._limit is None:
+            with self._hn.lock.read():
+                if self._drive is None:
+                    return len(self._hn.hypernetwork)
+
+                if len(self._drive) == 1:
+                    return len(self._drive[0])
+
+        return sum(1 for _ in self)
+
+    def all(self):
+        return list(self)
@@ -0,0 +1,207 @@
+# Reachability over the partOf links of a Hypernetwork.
+#   The strongly connected components of partOf are numbered as they are found, and the
+#   ancestors of a component, everything it is transitively part of, are held as an int
+#   bitset over those numbers.  Numbers are reused once a component is dropped, so a
+#   bitset only spans the components memoised.  Components are only built when asked
+#   for, reusing those of the parents, and as the partOf links change only the vertices
+#   below the one changed are patched or dropped.
+from bisect import bisect_left
+import threading
+
+
+class HnReachability:
+    def __init__(self, hn):
+        self._hn = hn
+        self._component = {}
+        self._ancestors = []
+        self._children = {}
+        self._free = []
+        self._mutex = threading.Lock()
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k != "_mutex"}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._mutex = threading.Lock()
+
+    @property
+    def memoised(self):
+        return len(self._component)
+
+    def clear(self):
+        self._component.clear()
+        self._ancestors.clear()
+        self._children.clear()
+        self._free.clear()
+
+    def _parents(self, _id):
+        hs = self._hn.hypernetwork.get(self._hn.symbols.name(_id))
+        return hs.partOf_ids if hs else ()
+
+    def _number(self, ancestors):
+        if self._free:
+            c = self._free.pop()
+            self._ancestors[c] = ancestors
+        else:
+            c = len(self._ancestors)
+            self._ancestors.append(ancestors)
+
+        return c
+
+    def _is_part(self, _id, whole_id):
+        parents = self._parents(_id)
+        i = bisect_left(parents, whole_id)
+
+        return i < len(parents) and parents[i] == whole_id
+
+    def _below(self, _id):
+        # _id and the memoised vertices that are transitively part of it.  Children whose
+        #   link has since gone, or that were dropped, are pruned on the way.
+        found = {_id}
+        work = [_id]
+
+        while work:
+            v = work.pop()
+            children = self._children.get(v)
+            if not children:
+                continue
+
+            for child in list(children):
+                if child in found:
+                    continue
+
+                if child in self._component and self._is_part(child, v):
+                    found.add(child)
+                    work.append(child)
+                else:
+                    children.discard(child)
+
+        return found
+
+    def component(self, _id):
+        if _id in self._component:
+            return self._component[_id]
+
+        # Tarjan's algorithm, iteratively, as partOf can hold cycles.  A strongly connected
+        #   component is complete once all the components above it are, so each component
+        #   is built from the bitsets of its parents.
+        memo = self._component
+        order = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        work = [(_id, iter(self._parents(_id)))]
+        order[_id] = low[_id] = 0
+        stack.append(_id)
+        on_stack.add(_id)
+
+        while work:
+            v, parents = work[-1]
+            descended = False
+
+            for p in parents:
+                if p in memo:
+                    continue
+
+                if p not in order:
+                    order[p] = low[p] = len(order)
+                    stack.append(p)
+                    on_stack.add(p)
+                    work.append((p, iter(self._parents(p))))
+                    descended = True
+                    break
+
+                if p in on_stack:
+                    low[v] = min(low[v], order[p])
+
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[v])
+
+            if low[v] == order[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+
+                bits = 0
+                cyclic = len(component) > 1
+                members = set(component)
+                for w in component:
+                    for p in self._parents(w):
+                        if p in self._children:
+                            self._children[p].add(w)
+                        else:
+                            self._children[p] = {w}
+
+                        if p in members:
+                            cyclic = True
+                        else:
+                            bits |= (1 << memo[p]) | self._ancestors[memo[p]]
+
+                c = self._number(bits)
+                if cyclic:
+                    self._ancestors[c] |= 1 << c
+
+                for w in component:
+                    memo[w] = c
+
+        return memo[_id]
+
+    def reaches(self, part, whole):
+        # True when part is transitively part of whole.
+        with self._hn.lock.read():
+            whole_id = self._hn.symbols.get(whole)
+
+            if whole_id is None or part not in self._hn.hypernetwork:
+                return False
+
+            # Readers of a shared Hn build the components one at a time.  Every ancestor of
+            #   part is memoised with it, so a whole that is not is not one of them.
+            with self._mutex:
+                ancestors = self._ancestors[self.component(self._hn.symbols.id(part))]
+                whole_c = self._component.get(whole_id)
+
+                return whole_c is not None and bool(ancestors >> whole_c & 1)
+
+    def linked(self, part_id, whole_id):
+        # A new link only adds ancestors, to the part and everything below it.  Nothing
+        #   memoised is below a part that is not.
+        if part_id not in self._component:
+            return
+
+        whole_c = self.component(whole_id)
+        part_c = self._component[part_id]
+
+        # A link that closes a cycle merges components, so they are built again.
+        if whole_c == part_c or self._ancestors[whole_c] >> part_c & 1:
+            self.unlinked(part_id)
+            return
+
+        bits = (1 << whole_c) | self._ancestors[whole_c]
+        for c in {self._component[_id] for _id in self._below(part_id)}:
+            self._ancestors[c] |= bits
+
+        if whole_id in self._children:
+            self._children[whole_id].add(part_id)
+        else:
+            self._children[whole_id] = {part_id}
+
+    def unlinked(self, part_id):
+        # Removing a link can take ancestors away, so the part and everything below it are dropped.
+        if part_id not in self._component:
+            return
+
+        dropped = set()
+        for _id in self._below(part_id):
+            dropped.add(self._component.pop(_id))
+            self._children.pop(_id, None)
+
+        self._free.extend(dropped)
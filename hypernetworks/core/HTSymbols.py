@@ -0,0 +1,38 @@
+# Symbol table for a Hypernetwork.
+#   Vertex names are interned to dense integer ids, ids are never reused so they
+#   remain valid for the life of the Hn.
+from array import array
+
+
+class HnSymbols:
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+
+    def id(self, name):
+        if name in self._ids:
+            return self._ids[name]
+
+        _id = len(self._names)
+        self._ids[name] = _id
+        self._names.append(name)
+
+        return _id
+
+    def get(self, name):
+        return self._ids.get(name)
+
+    def name(self, _id):
+        return self._names[_id]
+
+    def ids(self, names):
+        return array('i', [self.id(name) for name in names])
+
+    def names(self, ids):
+        return [self._names[_id] for _id in ids]
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __len__(self):
+        return len(self._names)
@@ -0,0 +1,165 @@
+# Read-only views of part of a Hypernetwork.
+#   A view is the parent Hn plus a set of its vertices, nothing is copied.  Each Hs is seen
+#   with its simplex and partOf restricted to the vertices in the view, and a vertex can
+#   be included as a leaf, seen without its simplex, or be given the simplex it is seen
+#   with.  A view can be searched, printed, serialised and drawn like a Hn, materialize()
+#   gives a Hn that can be changed.
+from collections.abc import Mapping
+
+from hypernetworks.core.Hypersimplex import Hypersimplex, VERTEX, PROPERTY, NONE, special_name
+
+
+class HsView:
+    # The ids of the simplex and partOf are those of the parent, unrestricted.
+    __slots__ = ("_hs", "_view", "_leaf")
+
+    def __init__(self, hs, view, leaf=False):
+        self._hs = hs
+        self._view = view
+        self._leaf = leaf
+
+    def __getattr__(self, item):
+        return getattr(self._hs, item)
+
+    @property
+    def hstype(self):
+        if self._leaf:
+            return PROPERTY if self._hs.hstype == PROPERTY else VERTEX
+
+        return self._hs.hstype
+
+    def entries(self):
+        if self._leaf:
+            return []
+
+        if self._hs.vertex in self._view._simplices:
+            return self._view._simplices[self._hs.vertex]
+
+        return [(v, flags) for v, flags in self._hs.entries() if v in self._view]
+
+    @property
+    def simplex(self):
+        return [special_name(v, flags) for v, flags in self.entries()]
+
+    @property
+    def parts(self):
+        return [v for v, _ in self.entries()]
+
+    @property
+    def wholes(self):
+        return [v for v in self._hs.wholes if v in self._view and not self._view.is_leaf(v)]
+
+    @property
+    def partOf(self):
+        return set(self.wholes)
+
+    __str__ = Hypersimplex.__str__
+    copy = Hypersimplex.copy
+
+
+class _Hypersimplices(Mapping):
+    def __init__(self, view):
+        self._view = view
+
+    def __getitem__(self, vertex):
+        return self._view[vertex]
+
+    def __iter__(self):
+        return iter(self._view)
+
+    def __len__(self):
+        return len(self._view)
+
+
+class HypernetworkView:
+    def __init__(self, hn, vertices, leaves=None, name=None, simplices=None):
+        # simplices maps a vertex to the (vertex, flags) entries it is seen with in place of
+        #   its own simplex.
+        self._hn = hn
+        self._name = hn.name if name is None else name
+        self._vertices = dict.fromkeys(v for v in vertices if v in hn.hypernetwork)
+        self._leaves = {v for v in leaves if v in hn.hypernetwork and v not in self._vertices} if leaves else set()
+
+        self._simplices = simplices or {}
+
+        for v in self._leaves:
+            self._vertices[v] = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def parent(self):
+        return self._hn
+
+    @property
+    def hypernetwork(self):
+        return _Hypersimplices(self)
+
+    @property
+    def relations(self):
+        relations = self._hn.relations
+        hypernetwork = self._hn.hypernetwork
+
+        return {hypernetwork[v].R: relations[hypernetwork[v].R] for v in self._vertices
+                if v not in self._leaves and hypernetwork[v].R in relations}
+
+    def is_leaf(self, vertex):
+        return vertex in self._leaves
+
+    @property
+    def peaks(self):
+        return [v for v in self._vertices if not self[v].wholes]
+
+    def search(self, vertex="", hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", partOf=None):
+        # Searched in the parent, so the content of a Hs is matched against its full simplex,
+        #   and as there hstype only says how the simplex is matched.
+        found = self._hn.search(vertex=vertex, hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N,
+                                partOf=partOf)
+
+        return [v for v in found if v in self._vertices]
+
+    def materialize(self):
+        hn = type(self._hn)(name=self._name)
+
+        # partOf follows the simplices as they are seen in the view.
+        wholes = {v: [] for v in self._vertices}
+        for v in self._vertices:
+            for part in self[v].parts:
+                if part in wholes:
+                    wholes[part].append(v)
+
+        for v in self._vertices:
+            hs = self[v]
+            hn.load_hs(hs.copy(hn, partOf=wholes[v]))
+
+            if hs.R and not self.is_leaf(v):
+                hn.relations[hs.R] = self._hn.relations.get(hs.R)
+
+        return hn
+
+    def __getitem__(self, vertex):
+        if vertex not in self._vertices:
+            raise KeyError(vertex)
+
+        return HsView(self._hn.hypernetwork[vertex], self, vertex in self._leaves)
+
+    def __contains__(self, vertex):
+        return vertex in self._vertices
+
+    def __iter__(self):
+        return iter(self._vertices)
+
+    def __len__(self):
+        return len(self._vertices)
+
+    def __str__(self):
+        res = ""
+
+        for v in self._vertices:
+            hs = self[v]
+            if hs.hstype not in [NONE, VERTEX, PROPERTY]:
+                res = res + str(hs) + "\n"
+
+        return res
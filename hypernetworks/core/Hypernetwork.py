@@ -1,12 +1,23 @@
 import re
 
-from hypernetworks.utils.HTSearch import bottom_up
-
-from hypernetworks.core.HTErrors import HnVertexNoFound, HnUnknownHsType, HnInsertError
+from contextlib import contextmanager
+
+from hypernetworks.core.HTErrors import HnVertexNoFound, HnUnknownHsType, HnInsertError, HnJournalError
+from hypernetworks.core.HTIndex import HnIndex, intersect
+from hypernetworks.core.HTJournal import HnJournal, ADD, DELETE
+from hypernetworks.core.HTLock import HnRWLock, HnNoLock, reads, writes
+from hypernetworks.core.HTMemo import HnMemo, memoised
+from hypernetworks.core.HTMerge import merge, intersection
+from hypernetworks.core.HTQuery import HnQuery
+from hypernetworks.core.HTReachability import HnReachability
+from hypernetworks.core.HTSymbols import HnSymbols
 from hypernetworks.core.HTTypes import Types
-from hypernetworks.core.Hypersimplex import NONE, VERTEX, Hypersimplex, BETA, ALPHA, str_to_hstype, PROPERTY
-from hypernetworks.utils.HTPaths import get_peaks
-from hypernetworks.utils.HTTools import condense_all_specials, remove_special
+from hypernetworks.core.HTView import HypernetworkView
+from hypernetworks.core.Hypersimplex import NONE, VERTEX, Hypersimplex, BETA, ALPHA, str_to_hstype, PROPERTY, \
+    split_special
+from hypernetworks.utils.HTTools import condense_all_specials
+from hypernetworks.utils.HTMemory import memory_report
+from hypernetworks.utils.HTTraverse import traverse
 
 """
 from core.HTConfig import hs_replace_same_vertex
@@ -30,15 +41,29 @@ DOWN = -1
 
 
 class Hypernetwork:
-    _counter = 0
-
-    def __init__(self, name="Unnamed"):
+    # A thread_safe Hn can be shared between threads, searches and queries run in parallel
+    #   while changes made through the Hn are serialised.  Changes made directly to a Hs
+    #   are not locked.  With journal set, each change is recorded in a HnJournal.
+    def __init__(self, name="Unnamed", thread_safe=False, journal=False):
         self._hypernetwork = dict()
         self._name = name
         self._types = Types()
         self._relations = dict()
+        self._symbols = HnSymbols()
+        self._index = HnIndex(self._symbols)
+        # The order the vertices were loaded in, search gives its results in this order.
+        self._position = {}
+        self._loaded = 0
+        self._peaks = {}
+        self._reachability = HnReachability(self)
+        self._batch_depth = 0
+        self._merges = {}
+        self._generation = 0
+        self._memo = HnMemo()
+        self._lock = HnRWLock() if thread_safe else HnNoLock()
+        self._counter = 0
+        self._journal = HnJournal() if journal else None
         # self._relations = Relations()
-        # self._counter = 0
 
     @property
     def counter(self):
@@ -56,13 +81,109 @@ class Hypernetwork:
     def relations(self):
         return self._relations
 
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def symbols(self):
+        return self._symbols
+
+    @property
+    def reachability(self):
+        return self._reachability
+
+    @property
+    def lock(self):
+        return self._lock
+
+    @property
+    def thread_safe(self):
+        return isinstance(self._lock, HnRWLock)
+
+    @property
+    def journal(self):
+        return self._journal
+
+    def changes_since(self, token=0):
+        if self._journal is None:
+            log.error("changes_since: the Hn does not keep a journal.")
+            raise HnJournalError
+
+        return self._journal.changes_since(token)
+
+    def subscribe(self, subscriber):
+        if self._journal is None:
+            log.error("subscribe: the Hn does not keep a journal.")
+            raise HnJournalError
+
+        return self._journal.subscribe(subscriber)
+
+    @property
+    def generation(self):
+        # Moved on by every mutation, derived results are only valid for the generation they were made at.
+        return self._generation
+
+    @property
+    def memo(self):
+        return self._memo
+
+    def touch(self):
+        self._generation += 1
+
+    @property
+    def peaks(self):
+        # A live view of the vertices that are not part of anything, in the order they became peaks.
+        return self._peaks.keys()
+
+    def set_peak(self, vertex, peak=True):
+        if peak:
+            self._peaks[vertex] = None
+        else:
+            self._peaks.pop(vertex, None)
+
     @property
     def empty(self):
         return len(self._hypernetwork) == 0
 
+    @writes
     def load_hs(self, hs):
+        if hs.vertex in self._hypernetwork:
+            self._index.remove(self._hypernetwork[hs.vertex])
+        else:
+            self._position[hs.vertex] = self._loaded
+            self._loaded += 1
+
         self._hypernetwork.update({hs.vertex: hs})
+        self._index.add(hs)
+        self.touch()
+
+        if self._journal is not None:
+            self._journal.record(ADD, hs.vertex)
+        self.set_peak(hs.vertex, not hs.partOf_ids)
+
+        if self._reachability.memoised:
+            self._reachability.unlinked(self._symbols.id(hs.vertex))
+
+    @writes
+    def unload_hs(self, vertex):
+        hs = self._hypernetwork.pop(vertex, None)
+
+        if hs:
+            self._index.remove(hs)
+            self._position.pop(vertex, None)
+            self._peaks.pop(vertex, None)
+            self.touch()
+
+            if self._journal is not None:
+                self._journal.record(DELETE, vertex)
+
+            if self._reachability.memoised:
+                self._reachability.unlinked(self._symbols.id(vertex))
 
+        return hs
+
+    @writes
     def add(self, vertex, hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="",
             psi="", partOf=None):
 
@@ -74,16 +195,16 @@ class Hypernetwork:
                 hstype = temp.hstype
 
             if temp.simplex and not simplex:
-                simplex = temp.simplex[:]
+                simplex = list(temp.simplex)
 
             if temp.R == "" and R == "":
                 R = temp.R
 
             if temp.C and not C:
-                C = temp.C.copy()
+                C = list(temp.C)
 
             if temp.B and not B:
-                B = temp.B.copy()
+                B = set(temp.B)
             # if temp.B == "" and B == "":
             #     B = temp.B.copy()
 
@@ -94,7 +215,7 @@ class Hypernetwork:
                 psi = temp.psi
 
             if temp.partOf and not partOf:
-                partOf = temp.partOf.copy()
+                partOf = set(temp.partOf)
 
             temp.update(hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N, psi=psi, partOf=partOf)
             self._hypernetwork[vertex] = temp
@@ -103,11 +224,13 @@ class Hypernetwork:
             # Create a new node
             hs = Hypersimplex(self, vertex, hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N,
                               psi=psi, partOf=partOf)
-            self._hypernetwork.update({vertex: hs})
+            self.load_hs(hs)
 
         if R:
             self._relations[R] = None
+            self.touch()
 
+    @writes
     def add_hs(self, vertex="", hs=None):
         if vertex:
             vertex = hs.vertex
@@ -115,79 +238,70 @@ class Hypernetwork:
         self.insert(vertex, hstype=hs.hstype, simplex=hs.simplex, R=hs.R, t=hs.t, C=hs.C, B=hs.B,
                     N=hs.N, psi=hs.psi)
 
+    @writes
     def delete(self, vertex="", R="", del_children=False):
-        def _delete(_vertex, _parent=""):
-            # if _parent in self._hypernetwork[_vertex].partOf:
-            #     self._hypernetwork[_vertex].partOf.remove(_parent)
-
-            for _vert in self._hypernetwork[_vertex].simplex:
-                if _vertex in self._hypernetwork[_vert].partOf:
-                    self._hypernetwork[_vert].partOf.remove(_vertex)
-
-                if del_children:
-                    if len(self._hypernetwork[_vert].partOf) == 0:
-                        _delete(_vert, _vertex)
-
-            # Removes all instances of the vertex.
-            for _whole in self._hypernetwork[_vertex].partOf:
-                for temp in self._hypernetwork[_whole].simplex:
-                    _part = remove_special(temp)
-                    if _part == _vertex:
-                        self._hypernetwork[_whole].simplex.remove(temp)
-
-            del self._hypernetwork[_vertex]
-        # End _delete
-
         # TODO may need more work
         if R:
-            vertices = self.search(R=R)
-            for vert in vertices:
-                _delete(_vertex=vert)
+            self.delete_many(list(self.query(R=R)), del_children=del_children)
 
         elif vertex and vertex in self._hypernetwork:
-            _delete(_vertex=vertex)
+            self.delete_many([vertex], del_children=del_children)
 
         else:
             raise HnVertexNoFound
 
+    @writes
+    def delete_many(self, vertices, del_children=False):
+        # Deleting removes the vertices from the simplex of their wholes, so any merges are
+        #   resolved first.
+        if self._merges:
+            self._resolve_merges()
+
+        for vertex in vertices:
+            if vertex not in self._hypernetwork:
+                log.error("delete_many: vertex not found.")
+                raise HnVertexNoFound
+
+        symbols = self._symbols
+        work = list(reversed(vertices))
+
+        while work:
+            _vertex = work.pop()
+            hs = self._hypernetwork.get(_vertex)
+
+            # Already gone as the child of an earlier vertex.
+            if hs is None:
+                continue
+
+            for _vert in hs.parts:
+                if _vert in self._hypernetwork:
+                    self._hypernetwork[_vert].remove_partOf(_vertex)
+
+                    if del_children and _vert in self._peaks:
+                        work.append(_vert)
+
+            # The wholes are found through partOf, and all instances of the vertex,
+            #   flagged or not, are removed from their simplex by id.
+            refs = {symbols.id(_vertex)}
+
+            for _whole in hs.partOf_ids:
+                whole = self._hypernetwork.get(symbols.name(_whole))
+                if whole:
+                    whole.remove_simplex_ids(refs)
+
+            self.unload_hs(_vertex)
+
+    @writes
     def insert(self, vertex="", hstype=NONE, simplex=None, R="", t=-1, C=None, B=None,
                N="", psi="", partOf=None):
-        def _remove_cyclic():
-            temp = list(set(self._hypernetwork[vertex].simplex).intersection(self._hypernetwork[vertex].partOf))
-            if temp:
-                for v in simplex:
-                    if isinstance(v, dict):
-                        v = list(v.values())[0]
-
-                    if v in temp:
-                        self._hypernetwork[vertex].simplex.remove(v)
-                        # if not self._hypernetwork[vertex].simplex:
-                        #     self._hypernetwork[vertex].simplex = "UNKNOWN-VERTEX"
-
-                    # if vertex in self._hypernetwork[v].partOf:
-                    #     self._hypernetwork[v].partOf.remove(vertex)
-        # End _remove_cyclic
-
         def _update_N(_N, _direction=UP):
-            res = ""
-            l = len(_N)
+            # A level is "N" or "N" with a signed offset, such as "N+1" or "N-2".
+            if not _N:
+                return ""
 
-            if _N:
-                if _direction == UP:
-                    if l == 1:
-                        res = "N+1"
-                    else:
-                        level = int(_N[:l - 1]) + 1
-                        res[:l] = str(level)
-
-                elif _direction == DOWN:
-                    if l == 1 or _N[:l - 1] == 1:
-                        res = "N"
-                    elif l > 2:
-                        level = int(_N[:l - 1]) - 1
-                        res[:l] = str(level)
+            level = (0 if _N == "N" else int(_N[1:])) + (1 if _direction == UP else -1)
 
-            return res
+            return "N" + ("" if level == 0 else "{0:+}".format(level))
         # End _update_N
 
         if simplex is None:
@@ -196,20 +310,34 @@ class Hypernetwork:
         if partOf is None:
             partOf = set()
 
+        if self._merges:
+            if vertex in self._merges:
+                # Keep merging into the staged BETA while the simplex differs from the merged one.
+                members = self._merges[vertex]
+                if hstype == BETA and simplex and (len(simplex) != len(members) or sorted(members) != simplex):
+                    members.update(condense_all_specials(simplex))
+                    return
+
+                self._resolve_merge(vertex)
+
         # TODO is this the right solution?  Or should it we use the matrix method.
 
         if vertex in self.hypernetwork:
             if self.hypernetwork[vertex].hstype == BETA and self.hypernetwork[vertex].simplex != simplex and simplex:
                 # Add to BETA
                 if hstype == BETA:
-                    self.hypernetwork[vertex].simplex = \
-                        list(sorted(set(self.hypernetwork[vertex].simplex).union(set(simplex))))
+                    simplex = condense_all_specials(simplex)
+                    if self._batch_depth:
+                        self._merges[vertex] = set(self.hypernetwork[vertex].simplex).union(set(simplex))
+                    else:
+                        self.hypernetwork[vertex].simplex = \
+                            list(sorted(set(self.hypernetwork[vertex].simplex).union(set(simplex))))
                     return
 
                 elif hstype in [ALPHA, VERTEX, PROPERTY]:
                     new_vertex = vertex + "@" + str(len(self.hypernetwork[vertex].simplex) + 1)
                     partOf.add(vertex)
-                    self.hypernetwork[vertex].simplex.append(new_vertex)
+                    self.hypernetwork[vertex].simplex = list(self.hypernetwork[vertex].simplex) + [new_vertex]
                     vertex = new_vertex
 
                 else:
@@ -224,7 +352,8 @@ class Hypernetwork:
                     self.add(vertex=vertex + "@1", hstype=tmpHs.hstype, simplex=tmpHs.simplex,
                              R=tmpHs.R, t=tmpHs.t, C=tmpHs.C, B=tmpHs.B, N=tmpHs.N,
                              psi=tmpHs.psi, partOf=set().add(vertex))
-                    self.hypernetwork.pop(vertex, None)
+
+                    self.unload_hs(vertex)
                     self.add(vertex=vertex, hstype=BETA, simplex=[vertex + "@1", vertex + "@2"],
                              R=tmpHs.R, t=tmpHs.t, C=tmpHs.C, B=tmpHs.B, N=_update_N(tmpHs.N), partOf=tmpHs.partOf)
 
@@ -261,7 +390,7 @@ class Hypernetwork:
                     self._counter -= 1
                     vertex = v
 
-                self._hypernetwork[vertex].update(R=R, t=t, C=C, B=B, N=N, psi=psi)
+                self.update(vertex, R=R, t=t, C=C, B=B, N=N, psi=psi)
 
         else:
             # TODO added this to union the partOf, not sure if it is correct, needs testing
@@ -273,82 +402,113 @@ class Hypernetwork:
             self.add(vertex=vertex, hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N, psi=psi,
                      partOf=partOf if isinstance(partOf, set) else {partOf})
 
-            for i, v in enumerate(simplex):
-                if "PROPERTY" in v:
-                    self._hypernetwork[vertex].simplex[i] = v["PROPERTY"]
-
             if partOf:
                 if isinstance(partOf, str):
                     if partOf in self._hypernetwork:
-                        self._hypernetwork[partOf].simplex.append(vertex)
+                        self._hypernetwork[partOf].simplex = list(self._hypernetwork[partOf].simplex) + [vertex]
 
                     else:
                         log.error("insert: partOf error.")
                         raise HnInsertError
 
-            for i, v in enumerate(simplex):
-                if isinstance(v, dict):
-                    if "PROPERTY" in v:
-                        self.add(vertex=v["PROPERTY"], hstype=PROPERTY, partOf={vertex}, B=B)
-                    else:
-                        key = list(v.keys())[0]
-                        self.add(vertex=v[key], hstype=VERTEX, partOf={vertex}, B=B)
-
+            # Each entry, whether parsed, "SEQ@" style or plain, is linked by its vertex.
+            for v in simplex:
+                if isinstance(v, dict) and "PROPERTY" in v:
+                    self.add(vertex=v["PROPERTY"], hstype=PROPERTY, partOf={vertex}, B=B)
                 else:
-                    self.add(vertex=v, hstype=VERTEX, partOf={vertex}, B=B)
+                    entry = split_special(v)
+                    if entry:
+                        self.add(vertex=entry[0], hstype=VERTEX, partOf={vertex}, B=B)
 
-        for v in simplex:
-            if isinstance(v, dict):
-                key = list(v.keys())[0]
-                v = v[key]
-
-            if v in self._hypernetwork:
-                self._hypernetwork[v].partOf.add(vertex)
+        self._link(vertex, [entry[0] for entry in map(split_special, simplex) if entry])
 
         # Remove cyclic references
-        _remove_cyclic()
+        self._remove_cyclic(vertex)
 
         return vertex
 
+    @writes
+    def insert_many(self, hss):
+        with self.batch():
+            return [self.insert(**hs) for hs in hss]
+
+    @contextmanager
+    def batch(self):
+        # Repeated BETA statements for a vertex inside a batch are merged into one member set,
+        #   which becomes its simplex when a search or another statement needs it, or when the
+        #   outermost batch exits.  partOf links and cyclic references are resolved as each
+        #   insert is made, so that the Hn is the same as without a batch.
+        with self._lock.write():
+            self._batch_depth += 1
+
+            try:
+                yield self
+
+            finally:
+                self._batch_depth -= 1
+
+                if self._batch_depth == 0:
+                    self._resolve_merges()
+
+    def _link(self, vertex, parts):
+        for v in parts:
+            if v in self._hypernetwork:
+                self._hypernetwork[v].add_partOf(vertex)
+
+    def _remove_cyclic(self, vertex):
+        hs = self._hypernetwork.get(vertex)
+        if not hs:
+            return
+
+        # Only plain references can be cyclic.
+        ids = hs.simplex_ids
+        if hs.simplex_flags:
+            ids = [_id for _id, flags in zip(ids, hs.simplex_flags) if not flags]
+
+        temp = set(ids).intersection(hs.partOf_ids)
+        if temp:
+            temp = set(self._symbols.names(temp))
+            hs.simplex = [v for v in hs.simplex if v not in temp]
+
+    def _resolve_merge(self, vertex):
+        members = self._merges.pop(vertex)
+
+        if vertex in self._hypernetwork:
+            self._hypernetwork[vertex].simplex = list(sorted(members))
+
+    def _resolve_merges(self):
+        for vertex in list(self._merges):
+            self._resolve_merge(vertex)
+
     # TODO Needs testing properly
+    @writes
     def union(self, _hn):
         # this_hn = str(self)
         # this_hn += str(_hn)
         # parser = load_parser()
         # compile_hn(self, parser, this_hn)
-        for name in _hn.hypernetwork:
-            hs = _hn.hypernetwork[name]
-            self.insert(hs.vertex, hstype=hs.hstype, simplex=hs.simplex,
-                        R=hs.R, t=hs.t, C=hs.C, B=hs.B, psi=hs.psi)
-
-        return self
+        with _hn.lock.read():
+            return merge(self, _hn)
 
     # TODO Needs testing properly
+    @reads
     def intersection(self, hn, inc_whole=False):
-        temp = Hypernetwork()
-
-        for name in self.hypernetwork:
-            if name in hn.hypernetwork:
-                hs = self.hypernetwork[name]
-                temp.insert(hs.vertex, hstype=hs.hstype, simplex=hs.simplex,
-                              R=hs.R, t=hs.t, C=hs.C, B=hs.B, psi=hs.psi)
-
-        if inc_whole:
-            names = temp.soup
-            new_hn = Hypernetwork()
-
-            for name in names:
-                bu = bottom_up(hn, False, name)
-                new_hn.union(bu)
+        with hn.lock.read():
+            return intersection(self, hn, inc_whole=inc_whole)
 
-        return new_hn
+    @writes
+    def update(self, vertex, hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", psi="", partOf=None):
+        if vertex not in self._hypernetwork:
+            log.error("update: vertex not found.")
+            raise HnVertexNoFound
 
-    def update(self):
-        pass
+        self._hypernetwork[vertex].update(hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N,
+                                          psi=psi, partOf=partOf)
 
     def preparse(self, hypernet):
         return
 
+    @writes
     def parse(self, hypernet):
         class _hypersimplex:
             hs_name = ""
@@ -486,6 +646,7 @@ class Hypernetwork:
 
                 if _relation.hs_where:
                     self.relations[_relation.hs_R] = _relation.hs_where
+                    self.touch()
 
                 _clear()
 
@@ -493,136 +654,119 @@ class Hypernetwork:
                 if _relation.hs_where:
                     self.relations[_relation.hs_R] = _relation.hs_where[0] \
                         if len(_relation.hs_where) == 1 else _relation.hs_where
+                    self.touch()
 
         return name
 
+    @reads
     def search(self, vertex="", hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", partOf=None):
-        res = []
-
-        for node in self._hypernetwork.values():
-            fail = False
-            found = False
+        # Intersect the index postings of each criteria.
+        postings = []
 
-            if vertex != "" and not fail:
-                if node.vertex == vertex:
-                    found = True
-                else:
-                    fail = True
+        # A search by content needs the simplices of any BETAs being merged in a batch.
+        if simplex and self._merges:
+            self._resolve_merges()
 
-            if simplex and not fail:
-                if hstype in [VERTEX, PROPERTY]:
-                    if node.simplex == simplex:
-                        found = True
-                    else:
-                        fail = True
+        if vertex != "":
+            postings.append({vertex: None} if vertex in self._hypernetwork else {})
 
-                elif hstype == ALPHA:
-                    if node.simplex == simplex:
-                        found = True
-                    else:
-                        fail = True
-
-                elif hstype == BETA:
-                    if node.simplex \
-                            and simplex \
-                            and set(node.simplex).intersection(set(simplex)) == set(node.simplex):
-                        found = True
-                    else:
-                        fail = True
+        # TODO needs more work when we implement full R functionality
+        if R:
+            postings.append(self._index.R(R))
 
-                else:
-                    fail = True
+        # TODO needs more work when we implement full T functionality
+        if t >= 0:
+            postings.append(self._index.t(t))
 
-            # TODO needs more work when we implement full R functionality
-            if R and not fail:
-                # if node.R == R or re.search(R, node.R):
-                if re.search(R, node.R):
-                    found = True
-                else:
-                    fail = True
+        if N:
+            postings.append(self._index.N(N))
 
-            # TODO needs more work when we implement full T functionality
-            if t >= 0 and not fail:
-                if node.t == t:
-                    found = True
-                else:
-                    fail = True
+        # TODO needs more work when we understand partOf better
+        # if partOf:
+        #     ...
 
-            if N and not fail:
-                # if N == node.N or re.match(N, node.N):
-                if re.match(N, node.N):
-                    found = True
-                else:
-                    fail = True
+        if B:
+            postings.append(self._index.B(B))
 
-            # TODO needs more work when we understand partOf better
-            # if partOf:
-            #     ...
+        if simplex:
+            if hstype not in [VERTEX, PROPERTY, ALPHA, BETA]:
+                return []
 
-            if B and not fail:
-                if intersection(B):
-                    found = True
-                else:
-                    fail = True
+            postings.append(self._index.simplex(hstype, simplex))
 
-            if found and not fail:
-                res.append(node.vertex)
+        # The postings are in the order the vertices were indexed in, which a change can alter.
+        res = intersect(postings)
+        if len(res) > 1:
+            res.sort(key=self._position.__getitem__)
 
         return res
 
-    def get_subHn(self, vertex="", hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", partOf=None):
-        class temp:
-            Hn = None
+    def query(self, vertex="", hstype=NONE, R="", t=-1, B=None, N="", limit=None):
+        # A lazy alternative to search, with no criteria every vertex is returned.
+        return HnQuery(self, vertex=vertex, hstype=hstype, R=R, t=t, B=B, N=N, limit=limit)
 
-        def _get_subHn(_hs):
-            if _hs.hstype not in [VERTEX, PROPERTY]:
-                for v in _hs.simplex:
-                    h = self.hypernetwork[v]
-                    _get_subHn(h)
-                    temp.Hn.add_hs(vertex=v, hs=h)
+    @reads
+    def get_subHn(self, vertex="", hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", partOf=None,
+                  copy=True):
+        # Without copy a HypernetworkView of the Hs found and those below them is given.
+        if simplex:
+            searchRes = self.search(vertex=vertex, hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N,
+                                    partOf=partOf)
+        elif any([vertex, hstype != NONE, R, t >= 0, B, N]):
+            searchRes = self.query(vertex=vertex, hstype=hstype, R=R, t=t, B=B, N=N)
+        else:
+            searchRes = []
 
-        temp.Hn = Hypernetwork()
-        searchRes = self.search(vertex=vertex, hstype=hstype, simplex=simplex, R=R, t=t, C=C, B=B, N=N, partOf=partOf)
+        # Each Hs found comes before the Hs below it, which come parts first.
+        region = {}
+        visited = set()
 
         for v in searchRes:
-            hs = self._hypernetwork[v]
-            temp.Hn.add_hs(vertex=v, hs=hs)
-            _get_subHn(hs)
+            if v not in visited:
+                visited.add(v)
+                region[v] = self._hypernetwork[v]
 
-        return temp.Hn
+                for hs in traverse(self._hypernetwork, region[v].parts, postorder=True, visited=visited):
+                    region[hs.vertex] = hs
 
-    def get_vertices(self, vertex="", R=""):
-        def _get_vertices(_vertex):
-            _res = set()
+        if not copy:
+            return HypernetworkView(self, region)
 
-            if self._hypernetwork[_vertex].hstype in [ALPHA, BETA]:
-                _res.add(_vertex)
-                for v in self._hypernetwork[_vertex].simplex:
-                    _res = _res.union(_get_vertices(v))
+        # The region is already consistent, so it is copied across without inserting each Hs,
+        #   only the partOf links within the region are kept.
+        subHn = Hypernetwork()
 
-            elif self._hypernetwork[_vertex].hstype in [VERTEX, PROPERTY]:
-                _res.add(self._hypernetwork[_vertex].vertex)
+        for v, hs in region.items():
+            subHn.load_hs(hs.copy(subHn, partOf=[whole for whole in hs.wholes if whole in region]))
 
-            else:
-                log.error("get_vertices: found an unknown Hs Type")
-                raise HnUnknownHsType
+            if hs.R:
+                subHn.relations[hs.R] = self._relations.get(hs.R)
 
-            return _res
+        return subHn
 
+    @memoised
+    def get_vertices(self, vertex="", R=""):
         res = set()
 
         if R:
-            vertices = self.search(R=R)
+            vertices = self.query(R=R)
         elif vertex:
-            vertices = self.search(vertex=vertex)
+            vertices = self.query(vertex=vertex)
         else:
-            vertices = self._hypernetwork.keys()
+            vertices = self.query()
+
+        for hs in traverse(self._hypernetwork, list(vertices)):
+            if hs.hstype not in [ALPHA, BETA, VERTEX, PROPERTY]:
+                log.error("get_vertices: found an unknown Hs Type")
+                raise HnUnknownHsType
 
-        for vert in vertices:
-            res = res.union(_get_vertices(vert))
+            res.add(hs.vertex)
 
         return list(res)
 
+    def memory_report(self):
+        return memory_report(self)
+
     @property
     def soup(self):
         return list(self.hypernetwork.keys())
@@ -634,6 +778,7 @@ class Hypernetwork:
     def __getitem__(self, item):
         return self._hypernetwork[item]
 
+    @reads
     def __str__(self):
         res = ""
 
@@ -643,15 +788,16 @@ class Hypernetwork:
 
         return res
 
+    @reads
     def test_str(self):
         def _test_str(vertex):
-            simplex = self.hypernetwork[remove_special(vertex)]
+            simplex = self.hypernetwork[vertex]
 
             _res = (simplex.vertex + "=") if simplex.vertex else ""
 
             if simplex.hstype == ALPHA:
                 _res += "<"
-                for v in simplex.simplex:
+                for v in simplex.parts:
                     _res += _test_str(v)
                     _res += ", "
 
@@ -665,7 +811,7 @@ class Hypernetwork:
 
             elif simplex.hstype == BETA:
                 _res += "{"
-                for v in simplex.simplex:
+                for v in simplex.parts:
                     _res += _test_str(v)
                     _res += ", "
 
@@ -683,9 +829,7 @@ class Hypernetwork:
         # End _test_str
 
         res = ""
-        peaks = get_peaks(self._hypernetwork)
-
-        for peak in peaks:
+        for peak in self.peaks:
             res += _test_str(peak)
 
         # A cheat, but it works
@@ -1,3 +1,8 @@
+from array import array
+from bisect import bisect_left
+
+from hypernetworks.core.HTJournal import UPDATE, LINK, UNLINK
+
 # Relation Types
 
 LOGIC = 0
@@ -11,10 +16,47 @@ ALPHA = 1
 BETA = 2
 PROPERTY = 3
 
+# Reference flags, a simplex entry can be a sequence, immutable or mandatory reference.
+SEQ = 1
+IMM = 2
+MAN = 4
+
+SPECIAL_KEYS = {"SEQ": SEQ, "IMM": IMM, "MAN": MAN}
+SPECIAL_PREFIXES = {SEQ: "SEQ@", IMM: "IMM@", MAN: "MAN@"}
+PREFIX_SPECIALS = {"SEQ@": SEQ, "IMM@": IMM, "MAN@": MAN}
+
 HS_TYPE = ['NONE', 'VERTEX', 'ALPHA', 'BETA', 'PROPERTY']
 hstype_to_str = lambda x: HS_TYPE[x + 1]
 str_to_hstype = lambda x: HS_TYPE.index(x) - 1
 
+# Shared empty containers, a Hs only allocates its own once it has content.
+EMPTY_LIST = ()
+EMPTY_SET = frozenset()
+
+
+def split_special(v):
+    # A simplex entry as a (vertex, flags) pair, from a pair, a parsed dict or a "SEQ@" style string.
+    #   Only reference and PROPERTY dicts are entries, any other parsed dict, such as the VAL of
+    #   a nested assign, gives None and is dropped from the simplex.
+    if isinstance(v, tuple):
+        return v
+
+    if isinstance(v, dict):
+        key = list(v.keys())[0]
+        if key in SPECIAL_KEYS:
+            return v[key], SPECIAL_KEYS[key]
+
+        return (v[key], 0) if key == "PROPERTY" else None
+
+    flags = PREFIX_SPECIALS.get(v[:4], 0)
+
+    return (v[4:], flags) if flags else (v, 0)
+
+
+def special_name(vertex, flags):
+    # The "SEQ@" style string of an entry, as used by the simplex view.
+    return SPECIAL_PREFIXES[flags] + vertex if flags else vertex
+
 
 class HsRelation:
     def __init__(self, _name, _reltype=LOGIC, _content=""):
@@ -49,6 +91,8 @@ class HsRelation:
 
 
 class HsVertex:
+    __slots__ = ("_vertex", "_type")
+
     def __init__(self, _vertex, _type=""):
         self._vertex = _vertex
         self._type = _type
@@ -71,48 +115,46 @@ class HsVertex:
 
 
 class Hypersimplex:
+    # The vertex is held as a plain str, an HsVertex is only kept for typed vertices.
+    # The simplex and partOf are held as arrays of ids from the Hn's symbol table,
+    #   partOf is kept sorted.  The reference flags of the simplex are held in a
+    #   parallel array, only once an entry has any.
+    __slots__ = ("_hypernetwork", "_vertex", "_hstype", "_simplex", "_flags", "_partOf",
+                 "_R", "_t", "_C", "_B", "_N", "_psi")
+
     def __init__(self, _hn, vertex, hstype=VERTEX, simplex=None, R="", t=-1, C=None,
                  B=None, N="", psi="", partOf=None, content=""):
         self._hypernetwork = _hn
-        self._simplex = []
-
-        if simplex:
-            for v in simplex:
-                if isinstance(v, dict):
-                    if "SEQ" in v:
-                        self._simplex.append("SEQ@" + v["SEQ"])
-                    elif "IMM" in v:
-                        self._simplex.append("IMM@" + v["IMM"])
-                    elif "MAN" in v:
-                        self._simplex.append("MAN@" + v["MAN"])
-                    else:
-                        if "PROPERTY" in v:
-                            self._simplex.append(v)
-
-                else:
-                    self._simplex.append(v)
-
-        self._partOf = set() if partOf is None else partOf
-        self._vertex = HsVertex(vertex)
+        self._simplex, self._flags = self._to_entries(simplex)
+        self._partOf = self._to_sorted_ids(partOf) if partOf else EMPTY_LIST
+        self._vertex = vertex.vertex if isinstance(vertex, HsVertex) and vertex.type == "" else vertex
         self._hstype = VERTEX if hstype == NONE else hstype
         self._R = R
         self._t = t
-        self._C = [] if C is None else C
-        self._B = set() if B is None else B
+        self._C = C if C else EMPTY_LIST
+        self._B = B if B else EMPTY_SET
         self._N = N
         self._psi = psi
 
     @property
     def vertex(self):
-        return self._vertex.vertex if self._vertex.type == "" else self._vertex
+        if isinstance(self._vertex, HsVertex) and self._vertex.type == "":
+            return self._vertex.vertex
+
+        return self._vertex
 
     @vertex.setter
     def vertex(self, _vertex):
+        old = self.vertex
+
         if isinstance(_vertex, HsVertex):
-            self._vertex.vertex = _vertex.vertex
-            self._vertex.type = _vertex.type
-        else:
+            self._vertex = _vertex.vertex if _vertex.type == "" else HsVertex(_vertex.vertex, _vertex.type)
+        elif isinstance(self._vertex, HsVertex):
             self._vertex.vertex = _vertex
+        else:
+            self._vertex = _vertex
+
+        self._changed("vertex", old, self.vertex)
 
     @property
     def hstype(self):
@@ -120,15 +162,78 @@ class Hypersimplex:
 
     @hstype.setter
     def hstype(self, value):
+        self._reindex("hstype", self._hstype, value)
         self._hstype = value
 
+    def _to_ids(self, names):
+        return self._hypernetwork.symbols.ids(names) if names else EMPTY_LIST
+
+    def _to_sorted_ids(self, names):
+        return array('i', sorted({self._hypernetwork.symbols.id(name) for name in names}))
+
+    def _to_names(self, ids):
+        return self._hypernetwork.symbols.names(ids)
+
+    def _to_entries(self, simplex):
+        if not simplex:
+            return EMPTY_LIST, EMPTY_LIST
+
+        names = []
+        flags = []
+        for v in simplex:
+            entry = split_special(v)
+            if entry is None:
+                continue
+
+            name, flag = entry
+            names.append(name)
+            flags.append(flag)
+
+        return self._to_ids(names), array('b', flags) if any(flags) else EMPTY_LIST
+
+    def _set_entries(self, simplex, flags):
+        self._reindex("simplex", (self._simplex, self._flags), (simplex, flags))
+        self._simplex = simplex
+        self._flags = flags
+
     @property
     def simplex(self):
-        return self._simplex
+        # The legacy view, flagged entries are given as "SEQ@" style strings.
+        if not self._simplex:
+            return EMPTY_LIST
+
+        return self._entry_names(self._simplex, self._flags)
 
     @simplex.setter
     def simplex(self, value):
-        self._simplex = value
+        self._set_entries(*self._to_entries(value))
+
+    @property
+    def parts(self):
+        # The vertices of the simplex, without their reference flags.
+        return self._to_names(self._simplex) if self._simplex else EMPTY_LIST
+
+    def entries(self):
+        if not self._flags:
+            return [(name, 0) for name in self.parts]
+
+        return list(zip(self.parts, self._flags))
+
+    @property
+    def simplex_ids(self):
+        return self._simplex
+
+    @property
+    def simplex_flags(self):
+        return self._flags
+
+    def remove_simplex_ids(self, ids):
+        keep = [i for i, _id in enumerate(self._simplex) if _id not in ids]
+
+        if len(keep) != len(self._simplex):
+            simplex = array('i', [self._simplex[i] for i in keep]) if keep else EMPTY_LIST
+            flags = array('b', [self._flags[i] for i in keep]) if keep and self._flags else EMPTY_LIST
+            self._set_entries(simplex, flags if any(flags) else EMPTY_LIST)
 
     @property
     def R(self):
@@ -136,15 +241,61 @@ class Hypersimplex:
 
     @R.setter
     def R(self, value):
+        self._reindex("R", self._R, value)
         self._R = value
 
     @property
     def partOf(self):
-        return self._partOf
+        return set(self._to_names(self._partOf)) if self._partOf else EMPTY_SET
 
     @partOf.setter
     def partOf(self, value):
-        self._partOf = value
+        was_peak = not self._partOf
+        old = self._partOf
+        self._partOf = self._to_sorted_ids(value) if value else EMPTY_LIST
+        self._repeak(was_peak)
+        self._relink()
+        self._journal(UPDATE, "partOf", old, self._partOf)
+
+    @property
+    def partOf_ids(self):
+        return self._partOf
+
+    @property
+    def wholes(self):
+        # The vertices this Hs is part of, as a list in the order of their ids.
+        return self._to_names(self._partOf) if self._partOf else EMPTY_LIST
+
+    def add_partOf(self, whole):
+        _id = self._hypernetwork.symbols.id(whole)
+
+        if not self._partOf:
+            self._partOf = array('i', [_id])
+            self._repeak(True)
+            self._relink(_id)
+            self._journal(LINK, "partOf", None, whole)
+        else:
+            # Wholes are usually newer than their parts, so this is mostly an append.
+            i = bisect_left(self._partOf, _id)
+            if i == len(self._partOf) or self._partOf[i] != _id:
+                self._partOf.insert(i, _id)
+                self._relink(_id)
+                self._journal(LINK, "partOf", None, whole)
+
+    def remove_partOf(self, whole):
+        _id = self._hypernetwork.symbols.get(whole)
+
+        if _id is not None and self._partOf:
+            i = bisect_left(self._partOf, _id)
+            if i < len(self._partOf) and self._partOf[i] == _id:
+                if len(self._partOf) == 1:
+                    self._partOf = EMPTY_LIST
+                    self._repeak(False)
+                else:
+                    del self._partOf[i]
+
+                self._relink()
+                self._journal(UNLINK, "partOf", whole, None)
 
     @property
     def t(self):
@@ -152,6 +303,7 @@ class Hypersimplex:
 
     @t.setter
     def t(self, value):
+        self._reindex("t", self._t, value)
         self._t = value
 
     @property
@@ -160,7 +312,9 @@ class Hypersimplex:
 
     @C.setter
     def C(self, value):
-        self._C = value
+        old = self._C
+        self._C = value if value else EMPTY_LIST
+        self._changed("C", old, self._C)
 
     @property
     def B(self):
@@ -168,7 +322,8 @@ class Hypersimplex:
 
     @B.setter
     def B(self, value):
-        self._B = value
+        self._reindex("B", self._B, value)
+        self._B = value if value else EMPTY_SET
 
     @property
     def N(self):
@@ -176,6 +331,7 @@ class Hypersimplex:
 
     @N.setter
     def N(self, value):
+        self._reindex("N", self._N, value)
         self._N = value
 
     @property
@@ -184,22 +340,89 @@ class Hypersimplex:
 
     @psi.setter
     def psi(self, value):
+        old = self._psi
         self._psi = value
+        self._changed("psi", old, value)
+
+    def _registered(self):
+        # The vertex of this Hs if it has been added to its Hn, otherwise None.
+        hn = self._hypernetwork
+        vertex = self._vertex.vertex if isinstance(self._vertex, HsVertex) else self._vertex
+
+        if hn is not None and hn.hypernetwork.get(vertex) is self:
+            return vertex
+
+        return None
+
+    def _reindex(self, field, old, new):
+        # Keep the owning Hn's indexes in step, but only once this Hs has been added to it.
+        if old != new and self._registered() is not None:
+            self._hypernetwork.index.update(self, field, old, new)
+            self._hypernetwork.touch()
+            self._journal(UPDATE, field, old, new)
+
+    def _touch(self):
+        if self._hypernetwork is not None:
+            self._hypernetwork.touch()
+
+    def _changed(self, field, old, new):
+        # For the fields that are not indexed.
+        self._touch()
+        self._journal(UPDATE, field, old, new)
+
+    def _journal(self, op, field, old, new):
+        # Record a change in the owning Hn's journal, when it keeps one and this Hs has been added to it.
+        hn = self._hypernetwork
+        if hn is None or hn.journal is None:
+            return
+
+        vertex = self._registered()
+        if vertex is None:
+            return
+
+        # The journal is given names, as ids mean nothing outside the Hn.
+        if field == "simplex":
+            old, new = self._entry_names(*old), self._entry_names(*new)
+        elif field == "partOf" and op == UPDATE:
+            old, new = set(self._to_names(old)), set(self._to_names(new))
+
+        hn.journal.record(op, vertex, field, old, new)
+
+    def _entry_names(self, ids, flags):
+        names = self._to_names(ids)
+        for i, _flags in enumerate(flags):
+            if _flags:
+                names[i] = special_name(names[i], _flags)
+
+        return names
+
+    def _relink(self, whole_id=None):
+        # Patch the Hn's reachability for a new whole, any other change drops what it knew.
+        self._touch()
+        reachability = self._hypernetwork.reachability
+
+        if reachability.memoised:
+            _id = self._hypernetwork.symbols.id(self.vertex)
+
+            if whole_id is None:
+                reachability.unlinked(_id)
+            else:
+                reachability.linked(_id, whole_id)
+
+    def _repeak(self, was_peak):
+        # A Hs is a peak when it is not part of anything.
+        if was_peak != (not self._partOf):
+            vertex = self._registered()
+
+            if vertex is not None:
+                self._hypernetwork.set_peak(vertex, not self._partOf)
 
     def update(self, hstype=NONE, simplex=None, R="", t=-1, C=None, B=None, N="", psi="", partOf=None):
         if hstype != NONE:
             self.hstype = hstype
 
         if simplex:
-            new_simplex = []
-            for v in simplex:
-                if isinstance(v, dict):
-                    key = list(v.keys())[0]
-                    new_simplex.append(key + "@" + v[key])
-                else:
-                    new_simplex.append(v)
-            # new_simplex = [("SEQ@" + v['SEQ']) if isinstance(v, dict) else v for v in simplex]
-            self.simplex = new_simplex
+            self.simplex = simplex
 
         if R:
             self.R = R
@@ -220,10 +443,14 @@ class Hypersimplex:
             self.psi = psi
 
         if partOf:
-            if None in self._partOf:
-                self._partOf = partOf
-            else:
-                self._partOf.union(partOf)
+            for whole in partOf:
+                self.add_partOf(whole)
+
+    def copy(self, hn, partOf=None):
+        # A copy of this Hs for the Hn hn, with the given partOf.
+        return Hypersimplex(hn, self.vertex, hstype=self.hstype, simplex=self.entries(), R=self.R, t=self.t,
+                            C=list(self.C) if self.C else None, B=set(self.B) if self.B else None,
+                            N=self.N, psi=self.psi, partOf=partOf)
 
     def _dump(self):
         return "vertex: " + str(self.vertex) \
@@ -249,13 +476,13 @@ class Hypersimplex:
                 bres = ""
 
             new_simplex = []
-            for v in self.simplex:
-                if v[:4] == "SEQ@":
-                    new_simplex.append("(" + v[4:len(v)] + ")")
-                elif v[:4] == "IMM@":
-                    new_simplex.append("[" + v[4:len(v)] + "]")
-                elif v[:4] == "MAN@":
-                    new_simplex.append("!" + v[4:len(v)])
+            for v, flags in self.entries():
+                if flags & SEQ:
+                    new_simplex.append("(" + v + ")")
+                elif flags & IMM:
+                    new_simplex.append("[" + v + "]")
+                elif flags & MAN:
+                    new_simplex.append("!" + v)
                 else:
                     if v in self._hypernetwork.hypernetwork and self._hypernetwork.hypernetwork[v].hstype == PROPERTY:
                             new_simplex.append("~" + v)
@@ -295,13 +522,13 @@ class Hypersimplex:
                 bres = ""
 
             new_simplex = []
-            for v in self.simplex:
-                if v[:4] == "SEQ@":
-                    new_simplex.append("(" + v[4:len(v)] + ")")
-                if v[:4] == "IMM@":
-                    new_simplex.append("[" + v[4:len(v)] + "]")
-                if v[:4] == "MAN@":
-                    new_simplex.append("!" + v[4:len(v)])
+            for v, flags in self.entries():
+                if flags & SEQ:
+                    new_simplex.append("(" + v + ")")
+                if flags & IMM:
+                    new_simplex.append("[" + v + "]")
+                if flags & MAN:
+                    new_simplex.append("!" + v)
                 else:
                     if self._hypernetwork[v].hstype == PROPERTY:
                         new_simplex.append("~" + v)
@@ -4,6 +4,15 @@ __all__ = ["Hypernetwork",
            "HTConfig",
            "HTErrors",
            "HTHelper",
+           "HTIndex",
+           "HTJournal",
+           "HTLock",
+           "HTMemo",
            "HTMeronymy",
+           "HTMerge",
+           "HTQuery",
+           "HTReachability",
            "HTRelations",
-           "HTTypes"]
+           "HTSymbols",
+           "HTTypes",
+           "HTView"]
@@ -0,0 +1,626 @@
+import io
+import random
+import threading
+
+import lark
+import pytest
+
+from hypernetworks.core.Algebra import memberOf, contains
+from hypernetworks.core.HTErrors import HnErrors
+from hypernetworks.core.HTJournal import ADD, UPDATE, DELETE, LINK, UNLINK
+from hypernetworks.core.Hypernetwork import Hypernetwork
+from hypernetworks.core.Hypersimplex import VERTEX, ALPHA, BETA, SEQ, IMM
+from hypernetworks.utils import HTCompiler
+from hypernetworks.utils.HTCompiler import load_parser, build_parser, compile_hn, compile_stream, compile_files
+from hypernetworks.utils.HTInOut import to_data
+from hypernetworks.utils.HTPartition import HnPartition, components
+from hypernetworks.utils.HTPaths import get_path
+from hypernetworks.utils.HTSearch import top_down, top_down_view, bottom_up, bottom_up_view
+from hypernetworks.utils.HTTools import remove_outliers
+from hypernetworks.utils.HTTraverse import traverse, UP
+
+
+@pytest.fixture
+def setup_hn():
+    parser = load_parser()
+    test_hn = Hypernetwork()
+
+    compile_hn(test_hn, parser, """
+        x=<a, b, c; R_x; t_1>
+        xy=<c, d; R_xy>^N+1
+        y={a, d; B(outer)}^N
+    """)
+
+    return test_hn
+
+
+def test_search_index(setup_hn):
+    test_hn = setup_hn
+
+    assert test_hn.search(R="x") == ["x", "xy"]
+    assert test_hn.search(R="^x$") == ["x"]
+    assert test_hn.search(t=1) == ["x"]
+    assert test_hn.search(N="N\\+1") == ["xy"]
+    assert sorted(test_hn.search(B={"outer"})) == ["a", "d", "y"]
+    assert test_hn.search(R="x", t=1) == ["x"]
+    assert test_hn.search() == []
+
+
+def test_search_index_follows_updates(setup_hn):
+    test_hn = setup_hn
+
+    test_hn.hypernetwork["x"].R = "z"
+    assert test_hn.search(R="x") == ["xy"]
+    assert test_hn.search(R="z") == ["x"]
+
+    # Results keep the order of the Hn, not the order the vertices were reindexed in.
+    test_hn.hypernetwork["x"].R = "x"
+    assert test_hn.search(R="x") == ["x", "xy"]
+
+    test_hn.delete(vertex="xy")
+    assert test_hn.search(R="x") == ["x"]
+
+
+def test_search_content_index(setup_hn):
+    test_hn = setup_hn
+
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "b", "c"]) == ["x"]
+    assert test_hn.search(hstype=ALPHA, simplex=["c", "b", "a"]) == []
+    assert test_hn.search(hstype=BETA, simplex=["d", "a", "e"]) == ["y"]
+    assert test_hn.search(hstype=BETA, simplex=["a", "e"]) == []
+
+    # The hstype only says how the simplex is matched, not what type the Hs found has.
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "d"]) == ["y"]
+    assert test_hn.search(hstype=VERTEX, simplex=["c", "d"]) == ["xy"]
+    assert test_hn.search(hstype=BETA, simplex=["a", "b", "c", "d"]) == ["x", "xy", "y"]
+
+    test_hn.update("x", simplex=["a", "b"])
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "b", "c"]) == []
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "b"]) == ["x"]
+
+
+def test_compact_hypersimplex(setup_hn):
+    test_hn = setup_hn
+    hs = test_hn.hypernetwork["x"]
+
+    assert not hasattr(hs, "__dict__")
+    assert test_hn.hypernetwork["a"].simplex == ()
+    assert test_hn.hypernetwork["x"].partOf == set()
+    assert test_hn.hypernetwork["a"].partOf == {"x", "y"}
+
+    test_hn.hypernetwork["c"].remove_partOf("x")
+    test_hn.hypernetwork["c"].remove_partOf("xy")
+    assert test_hn.hypernetwork["c"].partOf == set()
+
+
+def test_interned_simplex(setup_hn):
+    test_hn = setup_hn
+    symbols = test_hn.symbols
+    hs = test_hn.hypernetwork["x"]
+
+    assert symbols.names(hs.simplex_ids) == ["a", "b", "c"]
+    assert hs.simplex == ["a", "b", "c"]
+    assert symbols.names(test_hn.hypernetwork["a"].partOf_ids) == ["x", "y"]
+    assert symbols.get("unknown") is None
+
+
+def test_batch_insert():
+    test_hn = Hypernetwork()
+
+    with test_hn.batch():
+        test_hn.insert(vertex="V", hstype=ALPHA, simplex=["W", "a"])
+        test_hn.insert(vertex="W", hstype=ALPHA, simplex=["V", "b"])
+        test_hn.insert(vertex="s", hstype=BETA, simplex=["a", "b"])
+        test_hn.insert(vertex="s", hstype=BETA, simplex=["c"])
+
+        assert test_hn.hypernetwork["a"].partOf == {"V", "s"}
+
+    assert test_hn.hypernetwork["V"].simplex == ["W", "a"]
+    assert test_hn.hypernetwork["W"].simplex == ["b"]
+    assert test_hn.hypernetwork["W"].partOf == {"V"}
+    assert test_hn.hypernetwork["s"].simplex == ["a", "b", "c"]
+
+    names = test_hn.insert_many([{"vertex": "z", "hstype": ALPHA, "simplex": ["s", "V"]},
+                                 {"vertex": "s", "hstype": BETA, "simplex": ["d"]}])
+    assert names == ["z", None]
+    assert test_hn.hypernetwork["s"].simplex == ["a", "b", "c", "d"]
+    assert test_hn.hypernetwork["s"].partOf == {"z"}
+
+    parser = load_parser()
+    assert str(compile_hn(Hypernetwork(), parser, "b={h, b, b}\nb={e}\n")) == "b={e, h}\n"
+    assert str(compile_hn(Hypernetwork(), parser, "h={h, b}\nh=<a, e>\n")) == "h={b, h@2}\nh@2=<a, e>\n"
+    assert str(compile_hn(Hypernetwork(), parser, "b=<d, e>\nw={f, e=<b>}\n{b, h}\n")) == \
+        "b=<d, e>\ne=\nw={f, e}\nhs_0={b, h}\n"
+
+
+def test_batch_matches_serial():
+    # Random scripts give the same Hn whether their statements are inserted in a batch or not.
+    rng = random.Random(7)
+    names = ["a", "b", "e", "f", "h", "w", "x"]
+
+    def _vertex(depth, alpha):
+        r = rng.random()
+        if depth < 2 and r < 0.15:
+            return _hs(depth + 1, rng.random() < 0.5)
+        if alpha and r < 0.22:
+            return "(" + rng.choice(names) + ")"
+        if r < 0.27:
+            return "~" + rng.choice(names)
+        return rng.choice(names)
+
+    def _hs(depth, named):
+        alpha = rng.random() < 0.5
+        body = ", ".join(_vertex(depth, alpha) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            body += "; R_" + rng.choice(["p", "q"])
+        hs = ("<" + body + ">" if alpha else "{" + body + "}") + rng.choice(["", "", "", "^N"])
+        return rng.choice(names) + "=" + hs if named else hs
+
+    def _state(statements, batched):
+        # A script that cannot be compiled must fail the same way in both.
+        hn = Hypernetwork()
+        try:
+            if batched:
+                with hn.batch():
+                    hn.parse(statements)
+            else:
+                hn.parse(statements)
+
+        except (Exception, HnErrors) as e:
+            return type(e)
+
+        return str(hn), {v: (hs.hstype, hs.simplex, hs.partOf) for v, hs in hn.hypernetwork.items()}
+
+    parser = load_parser(inline=True)
+    for _ in range(300):
+        statements = parser.parse("".join(_hs(0, rng.random() < 0.8) + "\n" for _ in range(rng.randint(1, 5))))
+
+        assert _state(statements, True) == _state(statements, False)
+
+
+def test_query(setup_hn):
+    test_hn = setup_hn
+
+    assert test_hn.query(R="x").all() == ["x", "xy"]
+    assert test_hn.query(R="x", hstype=ALPHA, N="N\\+1").all() == ["xy"]
+    assert test_hn.query(hstype=BETA, B={"outer"}).all() == ["y"]
+    assert test_hn.query(R="x", limit=1).all() == ["x"]
+    assert test_hn.query(R="x").exists()
+    assert not test_hn.query(R="x", t=2).exists()
+    assert test_hn.query(hstype=ALPHA).count() == 2
+    assert test_hn.query().count() == len(test_hn.hypernetwork)
+
+    # The Hn can be changed while a query is iterated.
+    for vertex in test_hn.query(R="x"):
+        test_hn.insert(vertex=vertex + "2", hstype=ALPHA, simplex=["a", vertex], R="x")
+
+    for vertex in test_hn.query(hstype=ALPHA):
+        test_hn.delete(vertex=vertex)
+
+    assert test_hn.query(hstype=ALPHA).count() == 0
+
+
+def test_peaks(setup_hn):
+    test_hn = setup_hn
+
+    assert sorted(test_hn.peaks) == ["x", "xy", "y"]
+
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["x", "y"])
+    assert sorted(test_hn.peaks) == ["xy", "z"]
+
+    test_hn.delete(vertex="z")
+    assert sorted(test_hn.peaks) == ["x", "xy", "y"]
+
+    test_hn.hypernetwork["c"].partOf = set()
+    assert "c" in test_hn.peaks
+
+
+def test_reachability(setup_hn):
+    test_hn = setup_hn
+
+    assert memberOf(test_hn, "c", "x")
+    assert contains(test_hn, "y", "a")
+    assert not memberOf(test_hn, "x", "c")
+
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["x", "y"])
+    assert memberOf(test_hn, "c", "z")
+
+    test_hn.delete(vertex="z")
+    assert not memberOf(test_hn, "c", "z")
+    assert not memberOf(test_hn, "b", "xy")
+
+    # A vertex deleted and inserted again above its old whole is not part of itself.
+    cyclic_hn = Hypernetwork()
+    cyclic_hn.insert(vertex="d", hstype=BETA, simplex=["b", "c"])
+    assert memberOf(cyclic_hn, "b", "d")
+
+    cyclic_hn.delete(vertex="b")
+    cyclic_hn.insert(vertex="b", hstype=ALPHA, simplex=["c", "d"])
+    assert memberOf(cyclic_hn, "c", "b")
+    assert not memberOf(cyclic_hn, "b", "b")
+    assert not memberOf(cyclic_hn, "b", "d")
+
+
+def test_union(setup_hn):
+    test_hn = setup_hn
+    union_hn = Hypernetwork().union(test_hn)
+
+    assert str(union_hn) == str(test_hn)
+    assert union_hn.hypernetwork["a"].partOf == {"x", "y"}
+    assert union_hn.hypernetwork["xy"].N == "N+1"
+
+    other_hn = Hypernetwork()
+    other_hn.insert(vertex="x", hstype=ALPHA, simplex=["a", "b", "c"], R="x", t=2)
+    other_hn.insert(vertex="y", hstype=BETA, simplex=["e"])
+    union_hn.union(other_hn)
+
+    assert union_hn.hypernetwork["x"].t == 2
+    assert union_hn.hypernetwork["y"].simplex == ["a", "d", "e"]
+
+    parser = load_parser()
+    mixed_hn = Hypernetwork()
+    compile_hn(mixed_hn, parser, "m=<(a), b, [c], !d>\n")
+    other_hn = Hypernetwork()
+    compile_hn(other_hn, parser, "m=<(a), b, [c], !d, e>\n")
+    mixed_hn.union(other_hn)
+
+    assert str(mixed_hn.hypernetwork["m@2"]) == "m@2=<(a), b, [c], !d, e>"
+    assert set(mixed_hn.hypernetwork) == {"m", "m@1", "m@2", "a", "b", "c", "d", "e"}
+    for part in ["a", "b", "c", "d", "e"]:
+        assert "m@2" in mixed_hn.hypernetwork[part].partOf
+
+    mixed_hn.insert(vertex="m@2", hstype=ALPHA, simplex=["SEQ@a", {"IMM": "c"}, "MAN@d", "f"])
+    mixed_hn.union(mixed_hn)
+
+    assert str(mixed_hn.hypernetwork["m@2@2"]) == "m@2@2=<(a), [c], !d, f>"
+    assert not [name for name in mixed_hn.hypernetwork if "@" in name and not name.startswith("m")]
+    for part in ["a", "c", "d", "f"]:
+        assert "m@2@2" in mixed_hn.hypernetwork[part].partOf
+
+    # A conflicting ALPHA above N is split into a BETA one level higher.
+    level_hn = compile_hn(Hypernetwork(), parser, "x=<a, b>^N+1\n")
+    level_hn.union(compile_hn(Hypernetwork(), parser, "x={a, c}^N+1\n"))
+
+    assert str(level_hn) == "x@1=<a, b>^N+1\nx={x@1, x@2}^N+2\nx@2={a, c}^N+1\n"
+
+
+def test_intersection(setup_hn):
+    test_hn = setup_hn
+    other_hn = Hypernetwork()
+    other_hn.insert(vertex="x", hstype=ALPHA, simplex=["a", "b", "c"])
+    other_hn.insert(vertex="z", hstype=BETA, simplex=["x", "q"])
+    other_hn.insert(vertex="w", hstype=ALPHA, simplex=["z", "r"])
+
+    inter_hn = test_hn.intersection(other_hn)
+    assert sorted(inter_hn.hypernetwork) == ["a", "b", "c", "x"]
+    assert inter_hn.hypernetwork["x"].simplex == ["a", "b", "c"]
+    assert inter_hn.hypernetwork["a"].partOf == {"x"}
+
+    inter_hn = test_hn.intersection(other_hn, inc_whole=True)
+    assert inter_hn.hypernetwork["z"].simplex == ["x"]
+    assert inter_hn.hypernetwork["w"].simplex == ["z", "r"]
+    assert inter_hn.hypernetwork["x"].partOf == {"z"}
+    assert "q" not in inter_hn.hypernetwork
+
+
+def test_delete_many():
+    parser = load_parser()
+    test_hn = Hypernetwork()
+
+    compile_hn(test_hn, parser, """
+        w=<a, (b), [c], p>
+        p=<q, r>^N
+        s={b, c, t; R_s}
+    """)
+
+    test_hn.delete_many(["b", "c"])
+    assert test_hn.hypernetwork["w"].simplex == ["a", "p"]
+    assert test_hn.hypernetwork["s"].simplex == ["t"]
+
+    test_hn.delete(vertex="w", del_children=True)
+    assert sorted(test_hn.hypernetwork) == ["s", "t"]
+
+    test_hn.delete(R="s")
+    assert sorted(test_hn.hypernetwork) == ["t"]
+
+
+def test_remove_outliers(setup_hn):
+    test_hn = setup_hn
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["a", "e", "f"], N="N")
+
+    remove_outliers(test_hn)
+    assert test_hn.hypernetwork["z"].simplex == ["a"]
+    assert "e" not in test_hn.hypernetwork
+
+
+def test_simplex_flags():
+    parser = load_parser()
+    test_hn = Hypernetwork()
+
+    compile_hn(test_hn, parser, """
+        w=<a, (b), [c]>
+        v=<a, b, c>
+    """)
+
+    hs = test_hn.hypernetwork["w"]
+    assert hs.simplex == ["a", "SEQ@b", "IMM@c"]
+    assert hs.parts == ["a", "b", "c"]
+    assert list(hs.simplex_flags) == [0, SEQ, IMM]
+    assert list(hs.simplex_ids) == list(test_hn.hypernetwork["v"].simplex_ids)
+    assert str(hs) == "w=<a, (b), [c]>"
+
+    assert test_hn.search(hstype=ALPHA, simplex=["a", {"SEQ": "b"}, {"IMM": "c"}]) == ["w"]
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "SEQ@b", "IMM@c"]) == ["w"]
+    assert test_hn.search(hstype=ALPHA, simplex=["a", "b", "c"]) == ["v"]
+
+    # The name of a nested assign is not an entry of the simplex.
+    test_hn = compile_hn(Hypernetwork(), parser, "x=<a=<b>>\n")
+    assert str(test_hn) == "hs_0=<b>\nx=<hs_0>\n"
+    assert test_hn.hypernetwork["x"].parts == ["hs_0"]
+    assert "a" not in test_hn.hypernetwork
+
+
+def test_memo(setup_hn):
+    test_hn = setup_hn
+    memo = test_hn.memo
+    misses = memo.misses
+
+    vertices = test_hn.get_vertices()
+    vertices.append("q")
+    assert sorted(test_hn.get_vertices()) == ["a", "b", "c", "d", "x", "xy", "y"]
+    assert memo.hits == 1
+
+    generation = test_hn.generation
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["a", "e"])
+    assert test_hn.generation > generation
+    assert "e" in test_hn.get_vertices()
+    assert memo.misses == misses + 2
+
+    memo.max_bytes = 0
+    test_hn.get_vertices(R="x")
+    assert len(memo) == 0
+
+
+def test_thread_safe():
+    test_hn = Hypernetwork(thread_safe=True)
+    errors = []
+
+    def _write(_n):
+        try:
+            for i in range(200):
+                test_hn.insert(vertex="w{}_{}".format(_n, i), hstype=ALPHA, simplex=["a", "v{}".format(i)], R="w")
+        except BaseException as e:
+            errors.append(e)
+
+    def _read():
+        try:
+            for i in range(200):
+                test_hn.search(R="w")
+                test_hn.query(hstype=ALPHA).all()
+                test_hn.get_vertices(R="w")
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=_write, args=(n,)) for n in range(2)] \
+        + [threading.Thread(target=_read) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert test_hn.query(R="w").count() == 400
+    assert len(test_hn.hypernetwork["a"].partOf) == 400
+    assert Hypernetwork().counter == 0
+
+
+def test_journal():
+    test_hn = Hypernetwork(journal=True)
+    changes = []
+    test_hn.subscribe(changes.append)
+
+    test_hn.insert(vertex="x", hstype=ALPHA, simplex=["a", "b"])
+    assert [(c.op, c.vertex) for c in test_hn.changes_since()] == [(ADD, "x"), (ADD, "a"), (ADD, "b")]
+
+    token = test_hn.journal.token
+    test_hn.update("x", R="r")
+    test_hn.insert(vertex="y", hstype=BETA, simplex=["a"])
+    test_hn.delete(vertex="y")
+
+    assert [(c.op, c.vertex, c.field) for c in test_hn.changes_since(token)] == \
+        [(UPDATE, "x", "R"), (ADD, "y", None), (LINK, "a", "partOf"), (UNLINK, "a", "partOf"), (DELETE, "y", None)]
+    assert test_hn.changes_since(token)[0].new == "r"
+    assert changes == test_hn.changes_since()
+
+
+def test_partition(setup_hn):
+    test_hn = setup_hn
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["e", "f"], R="x")
+
+    assert components(test_hn) == [["x", "a", "b", "c", "xy", "d", "y"], ["z", "e", "f"]]
+
+    with HnPartition(test_hn, max_workers=2) as partition:
+        assert len(partition.partitions) == 2
+        assert partition.search(R="x") == ["x", "xy", "z"]
+        assert sorted(partition.get_vertices(R="x")) == sorted(test_hn.get_vertices(R="x"))
+        assert partition.get_paths([("a", "x")], ignore_sb=True) == {("a", "x"): [["a", "x"]]}
+
+
+def test_memory_report(setup_hn):
+    report = setup_hn.memory_report()
+
+    assert report["total"] == sum(report["categories"].values())
+    assert report["categories"]["hypersimplex"] > 0
+    assert report["categories"]["index"] > 0
+    assert report["hstypes"]["ALPHA"]["count"] == 2
+    assert report["hstypes"]["BETA"]["avg_simplex"] == 2
+
+
+def test_traverse(setup_hn):
+    test_hn = setup_hn
+
+    assert [hs.vertex for hs in traverse(test_hn.hypernetwork, ["x", "xy"])] == ["x", "a", "b", "c", "xy", "d"]
+    assert [hs.vertex for hs in traverse(test_hn.hypernetwork, "x", postorder=True)] == ["a", "b", "c", "x"]
+    assert [hs.vertex for hs in traverse(test_hn.hypernetwork, "a", direction=UP)] == ["a", "x", "y"]
+
+    deep_hn = Hypernetwork()
+    with deep_hn.batch():
+        for i in range(3000):
+            deep_hn.insert(vertex="v" + str(i + 1), hstype=ALPHA, simplex=["v" + str(i), "u" + str(i)])
+
+    assert len(deep_hn.get_vertices(vertex="v3000")) == 6001
+    assert len(get_path(deep_hn, "v0", ignore_sb=True).paths[0]) == 3001
+
+
+def test_get_subHn(setup_hn):
+    test_hn = setup_hn
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["x", "y"])
+
+    sub_hn = test_hn.get_subHn(vertex="x")
+    assert list(sub_hn.hypernetwork) == ["x", "a", "b", "c"]
+    assert sub_hn.hypernetwork["a"].partOf == {"x"}
+    assert sub_hn.hypernetwork["x"].R == "x"
+
+    sub_hn = test_hn.get_subHn(vertex="z")
+    assert sorted(sub_hn.hypernetwork) == ["a", "b", "c", "d", "x", "y", "z"]
+    assert sub_hn.hypernetwork["a"].partOf == {"x", "y"}
+
+    view = test_hn.get_subHn(vertex="x", copy=False)
+    assert str(view) == "x=<a, b, c; R_x; t_1>\n"
+    assert view.hypernetwork["a"].partOf == {"x"}
+    assert "y" not in view
+    assert to_data(view) == to_data(view.materialize())
+
+    # A view searches as the Hn does, limited to its own vertices.
+    view = test_hn.get_subHn(vertex="z", copy=False)
+    for criteria in [{"hstype": BETA, "simplex": ["a", "b", "c", "d"]}, {"hstype": BETA, "R": "x"},
+                     {"hstype": ALPHA, "simplex": ["a", "d"]}]:
+        assert view.search(**criteria) == [v for v in test_hn.search(**criteria) if v in view]
+
+    assert view.search(hstype=BETA, simplex=["a", "b", "c", "d"]) == ["x", "y"]
+
+
+def test_top_down_bottom_up(setup_hn):
+    test_hn = setup_hn
+    test_hn.insert(vertex="z", hstype=ALPHA, simplex=["x", "y"])
+
+    td_hn = top_down(test_hn, True, "z")
+    assert isinstance(td_hn, Hypernetwork)
+    assert sorted(td_hn.hypernetwork) == ["a", "b", "c", "d", "x", "y", "z"]
+    assert str(top_down_view(test_hn, True, "z")) == str(td_hn)
+
+    bu_hn = bottom_up(test_hn, True, "a")
+    assert isinstance(bu_hn, Hypernetwork)
+    assert str(bu_hn.hypernetwork["y"]) == "y={a; B(outer)}^N"
+    assert str(bottom_up(test_hn, True, "y").hypernetwork["y"]) == "y={a, d; B(outer)}^N"
+    assert to_data(bottom_up_view(test_hn, True, "a")) == to_data(bu_hn)
+
+    # A BETA reached through a stale partOf is seen with the part it was reached from.
+    test_hn.hypernetwork["b"].add_partOf("y")
+    bu_hn = bottom_up(test_hn, True, "b")
+    assert str(bu_hn.hypernetwork["y"]) == "y={b; B(outer)}^N"
+    assert bu_hn.hypernetwork["b"].partOf == {"x", "y"}
+
+
+def test_load_parser(monkeypatch):
+    parser = load_parser()
+    assert parser is load_parser()
+
+    hn_str = "x=<a, b, c; R_x; t_1>\ny={d, e}\n"
+    assert parser.parse(hn_str) == build_parser().parse(hn_str)
+
+    # A prebuilt parser that lark cannot load is built instead.
+    def _fail(*args, **kwargs):
+        raise TypeError
+
+    monkeypatch.setattr(lark.Lark, "_load_from_dict", _fail)
+    monkeypatch.setattr(HTCompiler, "_parsers", {})
+    assert load_parser(inline=True).parse(hn_str) == build_parser(inline=True).parse(hn_str)
+
+
+def test_inline_parser(setup_hn):
+    hn = Hypernetwork()
+    compile_hn(hn, load_parser(inline=True), str(setup_hn))
+
+    assert to_data(hn) == to_data(setup_hn)
+
+
+def test_compile_stream(setup_hn):
+    hn_str = str(setup_hn) + "R_x -> v_1\n    /pred/ v_2;\nz=\n  <a, # <\n   b>^N+1\n"
+    progress = []
+
+    hn = Hypernetwork()
+    compile_stream(hn, io.StringIO(hn_str), chunk_size=50, progress=progress.append)
+
+    expected = Hypernetwork()
+    compile_hn(expected, load_parser(), hn_str)
+
+    assert to_data(hn) == to_data(expected)
+    assert len(progress) > 1
+    assert progress[-1].lines == hn_str.count("\n")
+    assert progress[-1].statements == str(setup_hn).count("\n") + 2
+
+
+def test_compile_files(tmp_path):
+    hn_strs = ["x=<a, b; R_x>\ny={x, c}\n", "z=<y, e>\nw={x, d}\n", "x=<a, b; R_x; t_1>\n"]
+    fnames = []
+
+    expected = Hypernetwork()
+    for i, hn_str in enumerate(hn_strs):
+        fnames.append(str(tmp_path / ("hn" + str(i) + ".hn")))
+        with open(fnames[-1], 'w') as f:
+            f.write(hn_str)
+
+        compile_hn(expected, load_parser(), hn_str)
+
+    hn = compile_files(Hypernetwork(), fnames, max_workers=2)
+
+    assert to_data(hn) == to_data(expected)
+    assert list(hn.hypernetwork) == list(expected.hypernetwork)
+
+    # Anonymous Hs are numbered across the files in their order, as they are when serial.
+    fnames = []
+    for i, hn_str in enumerate(["<a, b; R_p>\n", "<c, d; R_q>\n"]):
+        fnames.append(str(tmp_path / ("anon" + str(i) + ".hn")))
+        with open(fnames[-1], 'w') as f:
+            f.write(hn_str)
+
+    expected = compile_files(Hypernetwork(), fnames, max_workers=1)
+    assert str(expected.hypernetwork["hs_0"]) == "hs_0=<a, b; R_p>"
+    assert str(expected.hypernetwork["hs_1"]) == "hs_1=<c, d; R_q>"
+
+    for kwargs in [{}, {"stream": True}, {"cache": str(tmp_path / "cache")}]:
+        hn = compile_files(Hypernetwork(), fnames, max_workers=2, **kwargs)
+        assert str(hn) == str(expected)
+        assert list(hn.hypernetwork) == list(expected.hypernetwork)
+
+
+def test_compile_cache(setup_hn, tmp_path):
+    hn_str = str(setup_hn)
+
+    hn = compile_hn(Hypernetwork(), load_parser(), hn_str, cache=str(tmp_path))
+    assert str(hn) == str(setup_hn)
+    assert len(list(tmp_path.iterdir())) == 1
+
+    hn = compile_hn(Hypernetwork(), load_parser(), hn_str, cache=str(tmp_path))
+    assert str(hn) == str(setup_hn)
+    assert hn.hypernetwork["a"].partOf == setup_hn.hypernetwork["a"].partOf
+    assert hn.search(R="x") == setup_hn.search(R="x")
+
+    compile_hn(Hypernetwork(), load_parser(), hn_str + "z=<a, q>\n", cache=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # A hit numbers anonymous Hs just as compiling the source again would.
+    faces = "<e, s, r; R_face>\n<e, f, r; R_face>\n"
+    for cache in [None, str(tmp_path), str(tmp_path)]:
+        hn = compile_hn(Hypernetwork(), load_parser(), faces, cache=cache)
+        compile_hn(hn, load_parser(), "<x, y; R_face>\n", cache=cache)
+        compile_hn(hn, load_parser(), faces, cache=cache)
+
+        assert list(hn.hypernetwork) == ["hs_0", "e", "s", "r", "hs_1", "f", "hs_2", "x", "y"]
+        assert str(hn.hypernetwork["hs_2"]) == "hs_2=<x, y; R_face>"
+
+    # A parse error leaves the Hn as it was, with or without a cache.
+    hn = compile_hn(Hypernetwork(), load_parser(), "x=<a, b\n", cache=str(tmp_path))
+    assert not hn.hypernetwork
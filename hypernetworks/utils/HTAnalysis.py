@@ -1,8 +1,10 @@
 from copy import deepcopy
 
+from hypernetworks.core.HTMemo import memoised
 from hypernetworks.core.Hypersimplex import PROPERTY
 
 
+@memoised
 def ingress_egress_count(hn):
     res = {}
     for ref in hn.hypernetwork:
@@ -44,6 +46,7 @@ def check_vertex_count(hn, name, vertices_list):
     return len(_check_vertex_count(rel, vl)) == 0
 
 
+@memoised
 def check_all_vertices_count(hn):
     res = []
 
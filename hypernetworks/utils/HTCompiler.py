@@ -1,235 +1,418 @@
+import hashlib
+import io
+import os
+import pickle
+import re
+import threading
 import traceback
 
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from timeit import default_timer as timer
+
 import lark
 
 __HN_LARK__ = "./fullHT.lark"
+# The LALR parser for __HN_LARK__ prebuilt by save_parser(), it is only used while its
+#   digest matches the grammar and version of lark.
+__HN_PARSER__ = "./fullHT.parser"
 
+from hypernetworks import __version__
 from hypernetworks.core.HTConfig import hs_expand_R
 from hypernetworks.core.HTErrors import HnParseError
 from hypernetworks.core.HTUtils import expandR
 from hypernetworks.utils.HTAnalysis import check_all_vertices_count
 
+# The running totals of compile_stream, chars, lines and statements read so far.
+HnStreamProgress = namedtuple("HnStreamProgress", "chars lines statements chunks hypersimplices elapsed")
+
+# The tokens that open and close a statement.
+_BOUNDARY = re.compile(r"->|[<{(\[>})\];]")
+
+# The size in characters of the chunks compile_stream parses.
+_CHUNK_SIZE = 1024 * 1024
+
+# The parsers shared by every caller in the process, by inline, a LALR parser keeps no state
+#   between parses.
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def _path(fname):
+    return os.path.join(os.path.dirname(__file__), fname)
+
+
+def _digest():
+    with open(_path(__HN_LARK__), 'rb') as f:
+        return hashlib.sha256(f.read() + lark.__version__.encode()).hexdigest()
 
-def load_parser():
+
+def build_parser(inline=False):
+    # Builds the LALR tables from the grammar.
     kwargs = dict(rel_to=__file__, start="start")
+    if inline:
+        kwargs["transformer"] = HnTransformer()
+
     parser = lark.Lark.open(__HN_LARK__, parser="lalr", **kwargs)
 
     return parser
 
 
-def compile_hn(Hn, parser, hs_string):
-    @lark.v_args(inline=True)
-    class HnTransformer(lark.Transformer):
-        def start(self, *tokens):
-            res = []
-            for ht in tokens:
-                if isinstance(ht, list):
-                    for ht2 in ht:
-                        res.append(ht2)
-                else:
-                    res.append(ht)
-            return res
-
-        def rel(self, *tokens):
-            return {"REL": tokens}
-
-        def hn(self, *tokens):
-            return tokens[0]
-
-        def hs(self, *tokens):
-            return [t for t in tokens]
-
-        def assign(self, token):
-            return {"VAL": str(token)}
-
-        def alpha(self, *tokens):
-            # r = None
-            # where = None
-            # other = []
-
-            # for t in tokens:
-            #     if isinstance(t, dict):
-            #         for k, v in t.items():
-            #             if k == "R":
-            #                 r = v
-            #             if k == "WHERE":
-            #                 where = v
-            #             other.append({k: v})
-            #
-            #         if r and not where:  # If a where hasn't been provided, then get it from relations.
-            #             if r in Hn.relations:
-            #                 where = [Hn.relations[r]]
-            #                 if not where[0]:
-            #                     where = None
-            #
-            #         elif r:
-            #             print("WHERE", where)
-
-            res = []
-            r = ""
-            for at in tokens:
-                if "R" in at:
-                    r = at["R"]
-
-                if "WHERE" in at:
-                    at = {"WHERE": [{"R": r}, at["WHERE"][0] if len(at["WHERE"]) == 1 else at["WHERE"]]}
-
-                if isinstance(at, dict):
-                    if "SEQ" in at or "IMM" in at:
-                        res.append({"ALPHA": [at]})
-                    else:
-                        res.append(at)
+def save_parser(fname=None):
+    parser = build_parser()
+    data = io.BytesIO()
+    parser.save(data)
+
+    with open(fname or _path(__HN_PARSER__), 'wb') as f:
+        pickle.dump({"digest": _digest(), "parser": data.getvalue()}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return parser
+
+
+def _load_prebuilt(inline=False):
+    try:
+        with open(_path(__HN_PARSER__), 'rb') as f:
+            prebuilt = pickle.load(f)
+
+        if prebuilt.get("digest") == _digest():
+            if not inline:
+                return lark.Lark.load(io.BytesIO(prebuilt["parser"]))
+
+            # Lark.load takes no transformer, so an inline parser is loaded through the lark
+            #   it was saved with, as pinned in requirements.txt.
+            saved = pickle.loads(prebuilt["parser"])
+            return lark.Lark._load_from_dict(saved["data"], saved["memo"], transformer=HnTransformer())
+
+    except Exception:
+        # A prebuilt parser that is missing or cannot be loaded, for any reason, is built from
+        #   the grammar instead.
+        pass
+
+    return None
+
+
+def load_parser(inline=False):
+    # An inline parser applies HnTransformer as it parses, so that compile_hn never holds
+    #   the parse tree of the whole string.
+    if inline not in _parsers:
+        with _parsers_lock:
+            if inline not in _parsers:
+                _parsers[inline] = _load_prebuilt(inline) or build_parser(inline)
+
+    return _parsers[inline]
+
+
+@lark.v_args(inline=True)
+class HnTransformer(lark.Transformer):
+    def start(self, *tokens):
+        res = []
+        for ht in tokens:
+            if isinstance(ht, list):
+                for ht2 in ht:
+                    res.append(ht2)
+            else:
+                res.append(ht)
+        return res
+
+    def rel(self, *tokens):
+        return {"REL": tokens}
+
+    def hn(self, *tokens):
+        return tokens[0]
+
+    def hs(self, *tokens):
+        return [t for t in tokens]
+
+    def assign(self, token):
+        return {"VAL": str(token)}
+
+    def alpha(self, *tokens):
+        # r = None
+        # where = None
+        # other = []
+
+        # for t in tokens:
+        #     if isinstance(t, dict):
+        #         for k, v in t.items():
+        #             if k == "R":
+        #                 r = v
+        #             if k == "WHERE":
+        #                 where = v
+        #             other.append({k: v})
+        #
+        #         if r and not where:  # If a where hasn't been provided, then get it from relations.
+        #             if r in Hn.relations:
+        #                 where = [Hn.relations[r]]
+        #                 if not where[0]:
+        #                     where = None
+        #
+        #         elif r:
+        #             print("WHERE", where)
+
+        res = []
+        r = ""
+        for at in tokens:
+            if "R" in at:
+                r = at["R"]
+
+            if "WHERE" in at:
+                at = {"WHERE": [{"R": r}, at["WHERE"][0] if len(at["WHERE"]) == 1 else at["WHERE"]]}
+
+            if isinstance(at, dict):
+                if "SEQ" in at or "IMM" in at:
+                    res.append({"ALPHA": [at]})
                 else:
-                    res.append({"ALPHA": at})
+                    res.append(at)
+            else:
+                res.append({"ALPHA": at})
 
-            return res
+        return res
 
-        def beta(self, *tokens):
-            return [bt if isinstance(bt, dict) else {"BETA": bt} for bt in tokens]
+    def beta(self, *tokens):
+        return [bt if isinstance(bt, dict) else {"BETA": bt} for bt in tokens]
 
-        def a_simplex(self, *tokens):
-            return [e for e in tokens]
+    def a_simplex(self, *tokens):
+        return [e for e in tokens]
 
-        def b_simplex(self, *tokens):
-            return [e for e in tokens]
+    def b_simplex(self, *tokens):
+        return [e for e in tokens]
 
-        def a_vertex(self, token):
-            return token if isinstance(token, dict) or isinstance(token, list) else str(token)
+    def a_vertex(self, token):
+        return token if isinstance(token, dict) or isinstance(token, list) else str(token)
 
-        def vertex(self, *tokens):
-            res = []
-            for tk in tokens:
-                if isinstance(tk, dict):
-                    if "PROPERTY" in tk:
-                        res = tk
-                    else:
-                        res.append(tk)
-                elif isinstance(tk, list):
-                    res.append(tk[0])  # TODO Need to test this properly
+    def vertex(self, *tokens):
+        res = []
+        for tk in tokens:
+            if isinstance(tk, dict):
+                if "PROPERTY" in tk:
+                    res = tk
                 else:
-                    res = str(tk)  # TODO need to add functionality for typed
-                    break
+                    res.append(tk)
+            elif isinstance(tk, list):
+                res.append(tk[0])  # TODO Need to test this properly
+            else:
+                res = str(tk)  # TODO need to add functionality for typed
+                break
 
-            return res
+        return res
 
-        def empty_alpha(self):
-            return {"EMPTY_ALPHA": []}
+    def empty_alpha(self):
+        return {"EMPTY_ALPHA": []}
 
-        def empty_beta(self):
-            return {"EMPTY_BETA": set()}
+    def empty_beta(self):
+        return {"EMPTY_BETA": set()}
 
-        def sequence(self, token):
-            return {"SEQ": str(token)}
+    def sequence(self, token):
+        return {"SEQ": str(token)}
 
-        def immutable(self, token):
-            return {"IMM": str(token)}
+    def immutable(self, token):
+        return {"IMM": str(token)}
 
-        def mandatory(self, token):
-            return {"MAN": str(token)}
+    def mandatory(self, token):
+        return {"MAN": str(token)}
 
-        def property(self, token):
-            return {"PROPERTY": str(token)}
+    def property(self, token):
+        return {"PROPERTY": str(token)}
 
-        def r(self, *tokens):
-            if len(tokens) == 0:
-                return {'R': " "}  # TODO this is a cheat until I can think of a better way
+    def r(self, *tokens):
+        if len(tokens) == 0:
+            return {'R': " "}  # TODO this is a cheat until I can think of a better way
 
-            return {'R': str(tokens[0])}
+        return {'R': str(tokens[0])}
 
-        def time(self, token):
-            return {'t': int(token)}
+    def time(self, token):
+        return {'t': int(token)}
 
-        def coordinate(self, *tokens):
-            return {'COORD': [int(t) for t in tokens]}
+    def coordinate(self, *tokens):
+        return {'COORD': [int(t) for t in tokens]}
 
-        def boundary(self, *tokens):
-            return {'B': {str(t) for t in tokens}}
+    def boundary(self, *tokens):
+        return {'B': {str(t) for t in tokens}}
 
-        def level(self, *tokens):
-            if len(tokens) == 0:
-                return {'N': "N"}
+    def level(self, *tokens):
+        if len(tokens) == 0:
+            return {'N': "N"}
 
-            return {'N': "N" + "".join(tokens)}
+        return {'N': "N" + "".join(tokens)}
 
-        def psi(self, token):
-            return {'psi': str(token)}
+    def psi(self, token):
+        return {'psi': str(token)}
 
-        # TODO doesn't currently do anything
-        def typed(self, *tokens):
-            if len(tokens) == 1:
-                return {"TYPE": str(tokens[0])}
+    # TODO doesn't currently do anything
+    def typed(self, *tokens):
+        if len(tokens) == 1:
+            return {"TYPE": str(tokens[0])}
 
-            return {"TYPE": (str(tokens[0]), str(tokens[1]))}
+        return {"TYPE": (str(tokens[0]), str(tokens[1]))}
 
-        def where(self, *tokens):
-            return {"WHERE": list(tokens)}
+    def where(self, *tokens):
+        return {"WHERE": list(tokens)}
 
-        def named_rel(self, *tokens):
-            res = []
-            rname = ""
-            for t in tokens:
-                # TODO need to look at this again, it's not a great way of doing this!
-                if t.get("RNAME"):
-                    rname = t.get("RNAME")
-                elif t.get("VNAME"):
-                    res.append(t.get("VNAME"))
-                else:
-                    res.append(t)
+    def named_rel(self, *tokens):
+        res = []
+        rname = ""
+        for t in tokens:
+            # TODO need to look at this again, it's not a great way of doing this!
+            if t.get("RNAME"):
+                rname = t.get("RNAME")
+            elif t.get("VNAME"):
+                res.append(t.get("VNAME"))
+            else:
+                res.append(t)
+
+        if not rname:
+            #  TODO log missing RNAME
+            return
+
+        return {rname: res}
+
+    def nary(self, *tokens):
+        return self.named_rel(tokens)
+
+    def rname(self, token):
+        return {"RNAME": str(token)}
+
+    def vname(self, token):
+        return {"VNAME": int(token)}
+
+    def relation(self, *tokens):
+        return {"RELATION": list(tokens)}
+
+    def rel_assign(self, token):
+        return {"R": str(token)}
+
+    def rels_expr(self, *tokens):
+        return list(tokens)
+
+    def pred(self, token):
+        return {"PRED": str(token)}
+
+    def logic_and(self, *tokens):
+        return "AND"
+
+    def logic_or(self, *tokens):
+        return "OR"
 
-            if not rname:
-                #  TODO log missing RNAME
-                return
+    def psis(self, *tokens):
+        return [[{"VERTEX": ""}, {"VAL": str(tokens[0])}, {"psi": str(tokens[1])}]]
 
-            return {rname: res}
+    # TODO
+    def derived(self, *tokens):
+        return {"DERIVED": [tokens]}
 
-        def nary(self, *tokens):
-            return self.named_rel(tokens)
+    def wexpr(self, *tokens):
+        return {}
 
-        def rname(self, token):
-            return {"RNAME": str(token)}
 
-        def vname(self, token):
-            return {"VNAME": int(token)}
+def _parse(parser, hs_string):
+    if parser.options.transformer:
+        return parser.parse(hs_string)
 
-        def relation(self, *tokens):
-            return {"RELATION": list(tokens)}
+    tree = parser.parse(hs_string)
+    # print(tree.pretty())
+    return HnTransformer().transform(tree)
 
-        def rel_assign(self, token):
-            return {"R": str(token)}
 
-        def rels_expr(self, *tokens):
-            return list(tokens)
+def _check_vertices(Hn):
+    # Validate the Hn for consistency.
+    vertex_comparison = check_all_vertices_count(Hn)
+    if len(vertex_comparison) > 0:
+        print("WARNING:", ", ".join(vertex_comparison), "failed the vertex check!")
 
-        def pred(self, token):
-            return {"PRED": str(token)}
 
-        def logic_and(self, *tokens):
-            return "AND"
+def _apply(Hn, parses):
+    # Adds the statements of each parse to Hn in turn, e.g. those of each chunk of a file.
+    for hs in parses:
+        with Hn.batch():
+            Hn.parse(hs)
 
-        def logic_or(self, *tokens):
-            return "OR"
+    _check_vertices(Hn)
 
-        def psis(self, *tokens):
-            return [[{"VERTEX": ""}, {"VAL": str(tokens[0])}, {"psi": str(tokens[1])}]]
 
-        # TODO
-        def derived(self, *tokens):
-            return {"DERIVED": [tokens]}
+def _compile(Hn, parser, hs_string, cache=None):
+    if cache:
+        _compile_cached(Hn, parser, hs_string, cache)
+    else:
+        _apply(Hn, [_parse(parser, hs_string)])
 
-        def wexpr(self, *tokens):
-            return {}
+
+def _cache_fname(cache, hs_string):
+    key = hashlib.sha256(hs_string.encode() + _digest().encode() + __version__.encode()).hexdigest()
+
+    return os.path.join(cache, key + ".hn")
+
+
+def _load_cached(fname):
+    try:
+        with open(fname, 'rb') as f:
+            entry = pickle.load(f)
+
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    return entry if isinstance(entry, dict) else None
+
+
+def _save_cached(fname, entry):
+    # Written to a temporary file first, so that a reader never sees part of an entry.
+    temp = fname + "." + str(os.getpid()) + ".tmp"
 
     try:
-        tree = parser.parse(hs_string)
-        # print(tree.pretty())
-        transformer = HnTransformer()
-        hs = transformer.transform(tree)
-        Hn.parse(hs)
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with open(temp, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp, fname)
+
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _parse_cached(parser, hs_string, cache):
+    # The statements parsed from hs_string, from the cache or else parsed and cached.
+    fname = _cache_fname(cache, hs_string)
+    entry = _load_cached(fname)
+
+    if entry is None:
+        entry = {"hs": _parse(parser, hs_string), "hn": None}
+        _save_cached(fname, entry)
 
-        # Validate the Hn for consistency.
-        vertex_comparison = check_all_vertices_count(Hn)
-        if len(vertex_comparison) > 0:
-            print("WARNING:", ", ".join(vertex_comparison), "failed the vertex check!")
+    return entry["hs"]
+
+
+def _compile_cached(Hn, parser, hs_string, cache):
+    # An entry holds the statements parsed from hs_string, which are added to Hn just as a
+    #   parse would be.  Once they have been compiled to an empty Hn that is kept too, and
+    #   an empty Hn is then loaded from it, _counter and all.
+    fname = _cache_fname(cache, hs_string)
+    entry = _load_cached(fname)
+    empty = not (Hn.hypernetwork or Hn.relations or Hn._counter)
+
+    if empty and entry and entry["hn"] is not None:
+        compiled = entry["hn"]
+
+        with Hn.batch():
+            for hs in compiled.hypernetwork.values():
+                Hn.load_hs(hs.copy(Hn, partOf=hs.wholes))
+
+            Hn.relations.update(compiled.relations)
+            Hn._counter = compiled._counter
+
+        _check_vertices(Hn)
+        return
+
+    hs = entry["hs"] if entry else _parse(parser, hs_string)
+    _apply(Hn, [hs])
+
+    if empty or not entry:
+        _save_cached(fname, {"hs": hs, "hn": Hn if empty else None})
+
+
+def _guarded(Hn, compile, *args):
+    # Runs compile on Hn, an error is reported and Hn is returned as far as it was compiled.
+    try:
+        compile(Hn, *args)
 
     except lark.exceptions.UnexpectedToken:
         print("ERROR: lark exception Unexpected Token")
@@ -244,9 +427,186 @@ def compile_hn(Hn, parser, hs_string):
         return Hn
 
 
+def compile_hn(Hn, parser, hs_string, cache=None):
+    # cache is a directory of parsed and compiled sources, keyed by the source, the grammar and
+    #   the versions of lark and this library, an unchanged source is loaded from there rather
+    #   than parsed.  Only a trusted directory should be used, as the entries are pickled.
+    return _guarded(Hn, _compile, parser, hs_string, cache)
+
+
+def split_statements(fileobj):
+    # A generator of (text, lines, statements) for each run of lines in fileobj that ends on a
+    #   top-level statement boundary.  Brackets are counted outside of comments and a relation
+    #   runs to its ";", everything from "lambdas:" or "psis:" on is one run as they end a Hn.
+    pending = []
+    lines = statements = depth = 0
+    in_relation = assigning = sections = False
+
+    for line in fileobj:
+        if isinstance(line, bytes):
+            line = line.decode()
+
+        code = line.split("#", 1)[0]
+        stripped = code.strip()
+
+        if stripped:
+            if statements and not (sections or depth or in_relation or assigning or stripped.startswith("^")):
+                yield "".join(pending), lines, statements
+                pending, lines, statements = [], 0, 0
+
+            if depth == 0 and stripped.startswith(("lambdas:", "psis:")):
+                sections = True
+
+            for token in _BOUNDARY.findall(code):
+                if token == "->":
+                    in_relation = in_relation or depth == 0
+
+                elif token == ";":
+                    if depth == 0 and in_relation:
+                        in_relation = False
+                        statements += 1
+
+                elif token in "<{([":
+                    depth += 1
+
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        statements += 1
+
+            assigning = depth == 0 and stripped.endswith("=")
+
+        pending.append(line)
+        lines += 1
+
+    if pending:
+        yield "".join(pending), lines, statements
+
+
+def _chunks(fileobj, chunk_size, totals):
+    # A generator of the text and first line of each chunk of about chunk_size characters
+    #   read from fileobj, totals is updated as each run of statements is read.
+    chunk = []
+    chunk_start = 1
+    size = 0
+
+    for text, lines, statements in split_statements(fileobj):
+        if size and size + len(text) > chunk_size:
+            yield "".join(chunk), chunk_start
+            chunk_start = totals["lines"] + 1
+            chunk, size = [], 0
+
+        chunk.append(text)
+        size += len(text)
+        totals["chars"] += len(text)
+        totals["lines"] += lines
+        totals["statements"] += statements
+
+    if chunk:
+        yield "".join(chunk), chunk_start
+
+
+def _parse_chunk(parser, text, chunk_start):
+    try:
+        return _parse(parser, text)
+
+    except lark.exceptions.UnexpectedInput as e:
+        line = chunk_start + e.line - 1
+        print("ERROR: lark exception", type(e).__name__, "at line", line)
+        raise HnParseError("Parse error at line " + str(line))
+
+    except lark.exceptions.LarkError:
+        traceback.print_exc()
+        raise HnParseError("Parse error in the statements from line " + str(chunk_start))
+
+
+def compile_stream(Hn, fileobj, parser=None, chunk_size=_CHUNK_SIZE, progress=None):
+    # Compiles the statements read from fileobj in chunks of about chunk_size characters, so
+    #   that only a chunk and its parse are held at once.  progress is called with the running
+    #   totals after each chunk.
+    parser = parser or load_parser(inline=True)
+    start = timer()
+    totals = dict(chars=0, lines=0, statements=0, chunks=0)
+
+    for text, chunk_start in _chunks(fileobj, chunk_size, totals):
+        hs = _parse_chunk(parser, text, chunk_start)
+
+        with Hn.batch():
+            Hn.parse(hs)
+
+        totals["chunks"] += 1
+        if progress:
+            progress(HnStreamProgress(hypersimplices=len(Hn.hypernetwork), elapsed=timer() - start, **totals))
+
+    _check_vertices(Hn)
+
+    return Hn
+
+
+def _compile_file(Hn, fname, stream, cache):
+    if stream:
+        with open(fname, 'r') as f:
+            return compile_stream(Hn, f)
+
+    return compile_hn(Hn, load_parser(inline=True), load_ht(fname), cache=cache)
+
+
+def _parse_file(fname, stream, cache):
+    # Runs in a worker process, the parse of each chunk of the file, or of the whole file when
+    #   it is not streamed, is pickled back to compile_files.  The parse error of a file that is
+    #   not streamed is reported and the file gives no statements, as with compile_hn.
+    parser = load_parser(inline=True)
+
+    if stream:
+        with open(fname, 'r') as f:
+            totals = dict(chars=0, lines=0, statements=0)
+
+            return [_parse_chunk(parser, text, chunk_start)
+                    for text, chunk_start in _chunks(f, _CHUNK_SIZE, totals)]
+
+    hs_string = load_ht(fname)
+
+    try:
+        return [_parse_cached(parser, hs_string, cache) if cache else _parse(parser, hs_string)]
+
+    except lark.exceptions.UnexpectedToken:
+        print("ERROR: lark exception Unexpected Token")
+        traceback.print_exc()
+
+    except:
+        traceback.print_exc()
+
+    return []
+
+
+def compile_files(Hn, fnames, max_workers=None, stream=False, cache=None):
+    # Each file is parsed in a pool of processes, the statements of each are then added to Hn
+    #   in the order of fnames, whatever order the workers finish in, so that Hn is the same as
+    #   when the files are compiled one after another.  A streamed file is never cached.
+    max_workers = min(max_workers or os.cpu_count(), len(fnames))
+
+    if max_workers <= 1:
+        for fname in fnames:
+            _compile_file(Hn, fname, stream, cache)
+
+        return Hn
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        n = len(fnames)
+        for parses in executor.map(_parse_file, fnames, [stream] * n, [cache] * n):
+            if stream:
+                _apply(Hn, parses)
+            else:
+                _guarded(Hn, _apply, parses)
+
+    return Hn
+
+
 def load_ht(fname):
-    res = ""
-    for line in open(fname, 'r'):
-        res += line
+    with open(fname, 'r') as f:
+        return f.read()
+
 
-    return res
+if __name__ == "__main__":
+    # Regenerates __HN_PARSER__ after a change to the grammar.
+    save_parser()
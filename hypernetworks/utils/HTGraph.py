@@ -2,7 +2,8 @@ import logging as log
 
 from graphviz import Graph
 
-from hypernetworks.core.Hypersimplex import ALPHA, BETA, VERTEX, PROPERTY
+from hypernetworks.core.Hypersimplex import ALPHA, BETA, VERTEX, PROPERTY, SEQ, IMM, MAN
+from hypernetworks.utils.HTTraverse import traverse
 
 
 def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=False,
@@ -18,19 +19,16 @@ def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=Fa
             label = ""
             first = True
 
-            for vtx in _vertex.simplex:
+            for vtx, flags in _vertex.entries():
                 vtx_port = ""
 
-                if vtx[:4] == "SEQ@":
-                    vtx = vtx[4:len(vtx)]
+                if flags & SEQ:
                     vtx_lbl = ("(" + vtx + ")")
                     vtx_port = vtx
-                elif vtx[:4] == "IMM@":
-                    vtx = vtx[4:len(vtx)]
+                elif flags & IMM:
                     vtx_lbl = ("[" + vtx + "]")
                     vtx_port = vtx
-                elif vtx[:4] == "MAN@":
-                    vtx = vtx[4:len(vtx)]
+                elif flags & MAN:
                     vtx_lbl = ("[" + vtx + "]")
                     vtx_port = vtx
                 else:
@@ -51,10 +49,6 @@ def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=Fa
                     else:
                         label += " | <" + vtx_port + "> " + vtx_lbl
 
-                # TODO feels a bit contrived
-                if vtx_port:
-                    _add_nodes(Hn.hypernetwork[vtx_port])
-
             if _vertex.hstype == ALPHA:
                 temp.dot.attr('node', style='solid', shape='record')
             elif _vertex.hstype == BETA:
@@ -89,15 +83,11 @@ def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=Fa
     # End _add_nodes
 
     def _add_edges(_vertex):
-        for vtx in _vertex.simplex:
+        for vtx, flags in _vertex.entries():
             vtx_port = ""
 
-            if vtx[:4] == "SEQ@":
-                vtx_port = vtx[4:len(vtx)]
-            elif vtx[:4] == "IMM@":
-                vtx_port = vtx[4:len(vtx)]
-            elif vtx[:4] == "MAN@":
-                vtx_port = vtx[4:len(vtx)]
+            if flags:
+                vtx_port = vtx
             else:
                 if vtx in Hn.hypernetwork and Hn.hypernetwork[vtx].hstype not in [PROPERTY]:
                     vtx_port = vtx
@@ -108,10 +98,6 @@ def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=Fa
 
             elif _vertex.hstype == VERTEX:
                 temp.dot.edge(vtx_port, _vertex.vertex)
-
-            # TODO feels a bit contrived
-            if vtx_port:
-                _add_edges(Hn.hypernetwork[vtx_port])
     # End _add_edges
 
     if not Hn:
@@ -125,9 +111,14 @@ def to_graph(Hn, direction="", R="", vertex="", N="", A=None, strict_meronymy=Fa
     else:
         vertices = Hn.hypernetwork.keys()
 
-    for vert in vertices:
-        _add_nodes(Hn.hypernetwork[vert])
-        _add_edges(Hn.hypernetwork[vert])
+    # The nodes below each vertex are added before it, each node and its edges only once.
+    vertices = list(vertices)
+
+    for hs in traverse(Hn.hypernetwork, vertices, postorder=True):
+        _add_nodes(hs)
+
+    for hs in traverse(Hn.hypernetwork, vertices):
+        _add_edges(hs)
 
     if temp.clusters:
         new_cluster = []
@@ -1,7 +1,7 @@
 import re
 
 
-from hypernetworks.core.Hypersimplex import ALPHA, BETA, VERTEX, NONE
+from hypernetworks.core.Hypersimplex import ALPHA, BETA, VERTEX, NONE, SEQ, IMM, MAN
 
 
 def _latex(hs):
@@ -16,13 +16,13 @@ def _latex(hs):
             bres = ""
 
         new_simplex = []
-        for v in hs.simplex:
-            if v[:4] == "SEQ@":
-                v = "\\underline{" + v[4:len(v)] + "}"
-            if v[:4] == "IMM@":
-                v = "\\overline{" + v[4:len(v)] + "}"
-            if v[:4] == "MAN@":
-                v = "!" + v[4:len(v)]
+        for v, flags in hs.entries():
+            if flags & SEQ:
+                v = "\\underline{" + v + "}"
+            if flags & IMM:
+                v = "\\overline{" + v + "}"
+            if flags & MAN:
+                v = "!" + v
 
             new_simplex.append(v)
 
@@ -5,9 +5,11 @@ import numpy as np
 
 # TODO need to manage the decorators.
 from hypernetworks.core.HTErrors import HnSearchError, HnVertexNoFound
+from hypernetworks.core.HTMemo import memoised
 from hypernetworks.core.Hypersimplex import VERTEX, ALPHA, BETA
 
 
+@memoised
 def to_matrix(Hn, vertex="", R=""):
     class visit:
         ed = {}
@@ -89,9 +91,9 @@ def to_matrix(Hn, vertex="", R=""):
     M = []
 
     if R:
-        vertices = Hn.search(R=R)
+        vertices = Hn.query(R=R)
     elif vertex:
-        vertices = Hn.search(vertex=vertex)
+        vertices = Hn.query(vertex=vertex)
     else:
         vertices = Hn.hypernetwork.keys()
 
@@ -183,7 +185,8 @@ def from_matrix(Hn, M, vertex="", R="", replace=True):
     if vertex:
         temp = [{"VAL": vertex}, temp[0] if isinstance(temp[0], list) else temp]
 
-    Hn.parse(temp)
+    with Hn.batch():
+        Hn.parse(temp)
 
 
 def matrix_to_string(M, vertex="", R=""):
@@ -0,0 +1,82 @@
+# Memory usage of a Hypernetwork, by category and by hstype.
+#   Sizes are estimates from sys.getsizeof, an object shared between categories, such as
+#   a vertex name that is also in the symbol table, is counted in the first it is found in.
+import sys
+
+from hypernetworks.core.HTMemo import sizeof
+from hypernetworks.core.Hypersimplex import hstype_to_str
+
+# The indexes and caches of a Hn, as (attribute, category) pairs.
+CACHES = [("_symbols", "symbols"),
+          ("_index", "index"),
+          ("_position", "index"),
+          ("_peaks", "peaks"),
+          ("_reachability", "reachability"),
+          ("_memo", "memo"),
+          ("_journal", "journal")]
+
+CATEGORIES = ["hypernetwork", "hypersimplex", "vertex", "simplex", "partOf", "B_C", "attributes",
+              "relations"] + [category for _, category in CACHES]
+
+
+def memory_report(hn):
+    # The Hn itself is never walked into, only the parts of it counted here.
+    seen = {id(hn)}
+    categories = {category: 0 for category in CATEGORIES}
+    hstypes = {}
+
+    categories["hypernetwork"] = sys.getsizeof(hn.hypernetwork)
+    seen.add(id(hn.hypernetwork))
+
+    for hs in hn.hypernetwork.values():
+        seen.add(id(hs))
+
+        sizes = {"hypersimplex": sys.getsizeof(hs),
+                 "vertex": sizeof(hs.vertex, seen),
+                 "simplex": sizeof(hs.simplex_ids, seen) + sizeof(hs.simplex_flags, seen),
+                 "partOf": sizeof(hs.partOf_ids, seen),
+                 "B_C": sizeof(hs.B, seen) + sizeof(hs.C, seen),
+                 "attributes": sizeof(hs.R, seen) + sizeof(hs.N, seen) + sizeof(hs.psi, seen)}
+
+        for category, size in sizes.items():
+            categories[category] += size
+
+        hstype = hstype_to_str(hs.hstype)
+        if hstype not in hstypes:
+            hstypes[hstype] = {"count": 0, "bytes": 0, "simplex": 0, "partOf": 0}
+
+        stats = hstypes[hstype]
+        stats["count"] += 1
+        stats["bytes"] += sum(sizes.values())
+        stats["simplex"] += len(hs.simplex_ids)
+        stats["partOf"] += len(hs.partOf_ids)
+
+    categories["relations"] = sizeof(hn.relations, seen)
+
+    for attr, category in CACHES:
+        categories[category] += sizeof(vars(hn)[attr], seen)
+
+    for stats in hstypes.values():
+        stats["avg_bytes"] = stats["bytes"] / stats["count"]
+        stats["avg_simplex"] = stats.pop("simplex") / stats["count"]
+        stats["avg_partOf"] = stats.pop("partOf") / stats["count"]
+
+    return {"total": sum(categories.values()), "categories": categories, "hstypes": hstypes}
+
+
+def format_memory_report(report):
+    total = report["total"]
+    lines = ["{:<16}{:>14}{:>8}".format("Category", "Bytes", "%")]
+
+    for category, size in sorted(report["categories"].items(), key=lambda c: -c[1]):
+        lines.append("{:<16}{:>14,}{:>8.1f}".format(category, size, 100 * size / total if total else 0))
+
+    lines.append("{:<16}{:>14,}".format("total", total))
+    lines.append("")
+    lines.append("{:<16}{:>10}{:>14}{:>12}{:>12}".format("Hs type", "Count", "Avg bytes", "Avg simplex", "Avg partOf"))
+
+    for hstype, stats in report["hstypes"].items():
+        lines.append("{:<16}{:>10,}{:>14.1f}{:>12.2f}{:>12.2f}".format(hstype, stats["count"], stats["avg_bytes"],
+                                                                       stats["avg_simplex"], stats["avg_partOf"]))
+
+    return "\n".join(lines)
@@ -0,0 +1,167 @@
+# Partitioning of a Hypernetwork into its connected components.
+#   Vertices are connected through their simplex and partOf links, as a component is
+#   never split across partitions a query can be run on each partition, in a pool of
+#   processes, and the results merged.
+import heapq
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from hypernetworks.core.Hypernetwork import Hypernetwork
+from hypernetworks.utils.HTPaths import get_path
+
+
+def components(hn):
+    # Union-find over the symbol ids, the components are given in the order of the Hn.
+    symbols = hn.symbols
+    parent = {}
+
+    def _find(_id):
+        root = _id
+        while parent.get(root, root) != root:
+            root = parent[root]
+
+        while _id != root:
+            parent[_id], _id = root, parent[_id]
+
+        return root
+    # End _find
+
+    for vertex, hs in hn.hypernetwork.items():
+        root = _find(symbols.id(vertex))
+
+        for _id in hs.simplex_ids:
+            other = _find(_id)
+            if other != root:
+                parent[other] = root
+
+    res = {}
+    for vertex in hn.hypernetwork:
+        root = _find(symbols.id(vertex))
+
+        if root in res:
+            res[root].append(vertex)
+        else:
+            res[root] = [vertex]
+
+    return list(res.values())
+
+
+def partition(hn, n=None):
+    # The components packed into at most n Hns, the largest first onto the smallest partition.
+    comps = sorted(components(hn), key=len, reverse=True)
+    n = min(n or len(comps), len(comps))
+    order = {v: i for i, v in enumerate(hn.hypernetwork)}
+
+    bins = [[] for _ in range(n)]
+    sizes = [(0, i) for i in range(n)]
+
+    for comp in comps:
+        size, i = heapq.heappop(sizes)
+        bins[i].extend(comp)
+        heapq.heappush(sizes, (size + len(comp), i))
+
+    parts = []
+    for vertices in bins:
+        part = Hypernetwork(name=hn.name)
+        part.relations.update(hn.relations)
+
+        for vertex in sorted(vertices, key=order.get):
+            hs = hn.hypernetwork[vertex]
+            part.load_hs(hs.copy(part, partOf=hs.wholes))
+
+        parts.append(part)
+
+    return parts
+
+
+# The partitions held by each worker process, loaded once when the worker starts.
+_partitions = None
+
+
+def _load(partitions):
+    global _partitions
+    _partitions = partitions
+
+
+def _run(task, i, *args):
+    return task(_partitions[i], *args)
+
+
+def _search(hn, criteria):
+    return hn.search(**criteria)
+
+
+def _get_vertices(hn, vertex, R):
+    return hn.get_vertices(vertex=vertex, R=R)
+
+
+def _get_paths(hn, pairs, ignore_sb):
+    return [(pair, get_path(hn, pair[0], pair[1], ignore_sb).paths) for pair in pairs]
+
+
+class HnPartition:
+    def __init__(self, hn, partitions=None, max_workers=None):
+        self._max_workers = max_workers or os.cpu_count()
+        self._partitions = partition(hn, partitions or self._max_workers)
+        self._order = {v: i for i, v in enumerate(hn.hypernetwork)}
+        self._where = {v: i for i, part in enumerate(self._partitions) for v in part.hypernetwork}
+        self._executor = None
+
+    @property
+    def partitions(self):
+        return self._partitions
+
+    def _map(self, task, tasks):
+        # tasks holds a (partition, args) pair for each call of task.
+        if self._max_workers == 1 or len(self._partitions) == 1:
+            return [task(self._partitions[i], *args) for i, args in tasks]
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._max_workers, initializer=_load,
+                                                 initargs=(self._partitions,))
+
+        futures = [self._executor.submit(_run, task, i, *args) for i, args in tasks]
+
+        return [future.result() for future in futures]
+
+    def search(self, **criteria):
+        found = self._map(_search, [(i, (criteria,)) for i in range(len(self._partitions))])
+
+        return sorted(chain.from_iterable(found), key=self._order.get)
+
+    def get_vertices(self, vertex="", R=""):
+        if vertex:
+            tasks = [(self._where[vertex], (vertex, R))] if vertex in self._where else []
+        else:
+            tasks = [(i, (vertex, R)) for i in range(len(self._partitions))]
+
+        return list(chain.from_iterable(self._map(_get_vertices, tasks)))
+
+    def get_paths(self, pairs, ignore_sb=False):
+        # The paths for each (from_vertex, to_vertex) pair, a path never leaves the
+        #   component of its from_vertex.
+        grouped = {}
+        for pair in pairs:
+            i = self._where[pair[0]]
+
+            if i in grouped:
+                grouped[i].append(pair)
+            else:
+                grouped[i] = [pair]
+
+        found = self._map(_get_paths, [(i, (_pairs, ignore_sb)) for i, _pairs in grouped.items()])
+
+        return dict(chain.from_iterable(found))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
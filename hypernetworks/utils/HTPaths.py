@@ -3,7 +3,9 @@ from copy import deepcopy
 
 import hypernetworks.core.Hypernetwork
 from hypernetworks.core.Algebra import memberOf
+from hypernetworks.core.HTMemo import memoised
 from hypernetworks.utils.HTTools import find_in, passbyval
+from hypernetworks.utils.HTTraverse import paths
 
 
 UP = 1
@@ -161,15 +163,9 @@ def find_head(path1, path2):
     return None
 
 
+@memoised
 def get_peaks(hn):
-    res = []
-
-    for name in hn.hypernetwork:
-        hs = hn.hypernetwork[name]
-        if hs.partOf == set():
-            res.append(hs.vertex)
-
-    return res
+    return list(hn.peaks)
 
 
 class HsPath:
@@ -211,29 +207,13 @@ class HsPath:
         return item in self._paths
 
     def gen_path(self, from_vertex, to_vertex="", sb=None):
-        @passbyval
-        def _gen_path(_vertex, path_so_far=None, idx=0):
-            if path_so_far is None:
-                path_so_far = [_vertex.vertex]
-            else:
-                path_so_far.append(_vertex.vertex)
-
-            # If the specified vertex is found, or if the vertex has not been specified and the peak has been found
-            if _vertex.vertex == to_vertex or (not to_vertex and len(_vertex.partOf) == 0):
-                self._paths.append(path_so_far)
-                idx += 1
-
-            else:
-                if sb and len(hypernetworks.core.Hypernetwork.intersection(_vertex.B)) == 0:
-                    return
-
-                for part in _vertex.partOf:
-                    idx, result = _gen_path(self._hn[part], path_so_far, idx)
-
-            return idx, path_so_far
-        # End _gen_path
+        # The paths up to the specified vertex, or if the vertex has not been specified to the peaks.
+        #   A path stops at a vertex with none of the B of sb.
+        def _prune(_vertex):
+            return sb and len(sb.intersection(_vertex.B)) == 0
+        # End _prune
 
-        _gen_path(self._hn[from_vertex])
+        self._paths.extend(paths(self._hn, from_vertex, to_vertex, prune=_prune))
 
         return self._paths
 
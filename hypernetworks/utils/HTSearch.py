@@ -1,7 +1,7 @@
-import hypernetworks.core.Hypernetwork
-# import hypernetworks.core.Hypernetwork
+from hypernetworks.core.HTView import HypernetworkView
 from hypernetworks.core.Hypersimplex import BETA
 from hypernetworks.utils.HTPaths import HsPath, find_head
+from hypernetworks.utils.HTTraverse import traverse, UP
 
 
 def get_peak_path(hn, from_vertex, ignore_sb=False, sb=None):
@@ -65,50 +65,46 @@ def what_is_it(hn, ignore_sb=False, *vertex_list):
     return list(objects)
 
 
-def top_down(hn, ignore_sb=False, top_vertex=""):
-    class Hypernet:
-        B = set()
-        hypernetwork = hypernetworks.core.Hypernetwork.Hypernetwork()
-
-    def _iter(_hs):
-        if len(Hypernet.B) == 0 or len(hypernetworks.core.Hypernetwork.intersection(Hypernet.B)) > 1:
-            Hypernet.hypernetwork.insert(_hs.vertex, hstype=_hs.hstype,
-                                         simplex=_hs.simplex, R=_hs.R, t=_hs.t,
-                                         C=_hs.C, B=_hs.B, psi=_hs.psi)
-
-        for v in _hs.simplex:
-            _iter(hn.hypernetwork[v])
-    # End _iter
+def top_down_view(hn, ignore_sb=False, top_vertex=""):
+    # A view of the Hn below top_vertex.
+    found = []
 
     if top_vertex:
-        hs = hn.hypernetwork[top_vertex]
-        if not ignore_sb:
-            Hypernet.B = hs.B
-        _iter(hs)
+        B = set() if ignore_sb else hn.hypernetwork[top_vertex].B
 
-    return Hypernet.hypernetwork
+        for _hs in traverse(hn.hypernetwork, top_vertex):
+            if len(B) == 0 or len(_hs.B.intersection(B)) > 1:
+                found.append(_hs)
 
+    return HypernetworkView(hn, [_hs.vertex for _hs in found], leaves=[v for _hs in found for v in _hs.parts])
 
-def bottom_up(hn, ignore_sb=False, bottom_vertex=""):
-    class Hypernet:
-        B = set()
-        hypernetwork = hypernetworks.core.Hypernetwork.Hypernetwork()
 
-    def _iter(_hs, parent=""):
-        if len(Hypernet.B) == 0 or len(hypernetworks.core.Hypernetwork.intersection(Hypernet.B)) > 1:
-            simplex = [parent] if _hs.hstype == BETA else _hs.simplex
-            Hypernet.hypernetwork.insert(_hs.vertex, hstype=_hs.hstype,
-                                         simplex=simplex, R=_hs.R, t=_hs.t,
-                                         C=_hs.C, B=_hs.B, psi=_hs.psi)
+def top_down(hn, ignore_sb=False, top_vertex=""):
+    return top_down_view(hn, ignore_sb, top_vertex).materialize()
+
 
-        for v in _hs.partOf:
-            _iter(hn.hypernetwork[v], _hs.vertex)
-    # End _iter
+def bottom_up_view(hn, ignore_sb=False, bottom_vertex=""):
+    # A view of the Hn above bottom_vertex, which keeps all of its simplex as does an ALPHA,
+    #   while any other BETA is seen with just the parts that it was reached from.
+    found = []
 
     if bottom_vertex:
-        hs = hn.hypernetwork[bottom_vertex]
-        if not ignore_sb:
-            Hypernet.B = hs.B
-        _iter(hs)
+        B = set() if ignore_sb else hn.hypernetwork[bottom_vertex].B
 
-    return Hypernet.hypernetwork
+        for _hs in traverse(hn.hypernetwork, bottom_vertex, direction=UP):
+            if len(B) == 0 or len(_hs.B.intersection(B)) > 1:
+                found.append(_hs)
+
+    reached = {_hs.vertex: [] for _hs in found if _hs.hstype == BETA and _hs.vertex != bottom_vertex}
+    for _hs in found:
+        for whole in _hs.wholes:
+            if whole in reached:
+                reached[whole].append((_hs.vertex, 0))
+
+    return HypernetworkView(hn, [_hs.vertex for _hs in found],
+                            leaves=[v for _hs in found if _hs.vertex not in reached for v in _hs.parts],
+                            simplices=reached)
+
+
+def bottom_up(hn, ignore_sb=False, bottom_vertex=""):
+    return bottom_up_view(hn, ignore_sb, bottom_vertex).materialize()
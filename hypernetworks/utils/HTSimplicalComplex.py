@@ -4,10 +4,12 @@ from graphviz import Graph
 
 
 # TODO inc_parent_links may need more work
+from hypernetworks.core.HTMemo import memoised
 from hypernetworks.core.Hypersimplex import BETA
 from hypernetworks.utils.QAnalysis import QAnalysis
 
 
+@memoised
 def gen_simplical_complex(hn, level=None, inc_parent_links=False, parent_links_only=False, exclude_beta=False):
     if level:
         hs_at_level = hn.search(N=level)
@@ -28,9 +30,8 @@ def gen_simplical_complex(hn, level=None, inc_parent_links=False, parent_links_o
 
     if parent_links_only:
         for hs in parents:
-            for v in hn.hypernetwork[hs].simplex:
-                v = v[4:len(v)] if v[:4] == "SEQ@" else v
-                if len(hn.hypernetwork[v].partOf) > 1:
+            for v in hn.hypernetwork[hs].parts:
+                if len(hn.hypernetwork[v].partOf_ids) > 1:
                     for p in hn.hypernetwork[v].partOf:
                         if exclude_beta:
                             if hn.hypernetwork[hs].hstype != BETA and hn.hypernetwork[p].hstype != BETA:
@@ -49,18 +50,16 @@ def gen_simplical_complex(hn, level=None, inc_parent_links=False, parent_links_o
     else:
         for hs in hs_at_level:
             if inc_parent_links:
-                for v in hn.hypernetwork[hs].simplex:
-                    v = v[4:len(v)] if v[:4] == "SEQ@" else v
+                for v in hn.hypernetwork[hs].parts:
                     if not exclude_beta:
                         edges.append((hs, v))
                     else:
                         if hn.hypernetwork[hs].hstype != BETA and hn.hypernetwork[v].hstype != BETA:
                             edges.append((hs, v))
 
-            for n, v1 in enumerate(hn.hypernetwork[hs].simplex):
-                v1 = v1[4:len(v)] if v1[:4] == "SEQ@" else v1
-                for v2 in hn.hypernetwork[hs].simplex[:n]:
-                    v2 = v2[4:len(v)] if v2[:4] == "SEQ@" else v2
+            parts = hn.hypernetwork[hs].parts
+            for n, v1 in enumerate(parts):
+                for v2 in parts[:n]:
                     edges.append((v1, v2))
 
     sc.add_edges_from(edges)
@@ -1,17 +1,23 @@
-from hypernetworks.core.Hypernetwork import Hypernetwork
+from hypernetworks.core.HTView import HypernetworkView
 from hypernetworks.core.Hypersimplex import BETA, ALPHA, VERTEX, PROPERTY
-from hypernetworks.utils.HTCompiler import load_parser, compile_hn
 from hypernetworks.utils.HTPaths import get_paths, get_underpath
 
 
-def get_space(hn, ignore_sb, shrink_beta, *vertex_list):
+def _view(hn, vertices):
+    # A view of the ALPHAs and BETAs in vertices, with their simplices as leaves.
+    wholes = [v for v in vertices if hn.hypernetwork[v].hstype not in [VERTEX, PROPERTY]]
+
+    return HypernetworkView(hn, wholes, leaves=[v for whole in wholes for v in hn.hypernetwork[whole].parts])
+
+
+def get_space_view(hn, ignore_sb, *vertex_list):
+    # A view of the space between the vertices, get_space gives it as a Hn.
     if len(vertex_list) <= 1:
         print("WARNING: get_space requires at least two vertices.")
         return None
 
     paths = get_paths(hn, ignore_sb, *vertex_list)
     shape = set()
-    parser = load_parser()
 
     for key, val in paths.items():
         path = paths.get(key)
@@ -22,19 +28,16 @@ def get_space(hn, ignore_sb, shrink_beta, *vertex_list):
                     for y in x:
                         shape.add(y)
 
-    s = ""
+    return _view(hn, [f for f in shape if hn.hypernetwork[f].hstype in [ALPHA, BETA]])
 
-    # TODO not keen on using this method, i.e. convert to tet and compile to get a ne Hn.
-    for f in shape:
-        if hn.hypernetwork[f].hstype in [ALPHA, BETA]:
-            s += str(hn.hypernetwork[f]) + "\n"
 
-    new_hn = Hypernetwork()
+def get_space(hn, ignore_sb, shrink_beta, *vertex_list):
+    view = get_space_view(hn, ignore_sb, *vertex_list)
 
-    if not s:
-        return new_hn
+    if view is None:
+        return None
 
-    compile_hn(new_hn, parser, s)
+    new_hn = view.materialize()
 
     # TODO Remove the unnecessary vertices from each BETA
     if shrink_beta:
@@ -59,28 +62,21 @@ def get_space(hn, ignore_sb, shrink_beta, *vertex_list):
                     new_hn.hypernetwork[name].hstype = VERTEX
 
         for d in to_del:
-            if d in new_hn.hypernetwork:
-                del new_hn.hypernetwork[d]
+            new_hn.unload_hs(d)
 
     return new_hn
 
 
-def underpath_to_hn(hn, vertex):
-    underpath_hn = Hypernetwork()
+def underpath_view(hn, vertex):
     underpath = get_underpath(hn, vertex)
-    parser = load_parser()
 
     vertex_list = set()
     for p1 in underpath:
         for p2 in p1:
             vertex_list.add(p2)
 
-    hn_str = ""
-    for v in vertex_list:
-        hs = hn.hypernetwork[v]
-        if hs.hstype not in [VERTEX, PROPERTY]:
-            hn_str += str(hs) + "\n"
+    return _view(hn, vertex_list)
 
-    compile_hn(underpath_hn, parser, hn_str)
 
-    return underpath_hn
+def underpath_to_hn(hn, vertex):
+    return underpath_view(hn, vertex).materialize()
@@ -1,6 +1,12 @@
+import re
+
 from copy import deepcopy
 
 from hypernetworks.core.HTUtils import of_hstype
+from hypernetworks.core.Hypersimplex import split_special, special_name
+
+
+SPECIALS = ["SEQ@", "IMM@", "MAN@"]
 
 
 def passbyval(func):
@@ -33,14 +39,19 @@ def is_mandatory(x):
 
 
 def remove_outliers(hn, N="N", smallest_nary=2):
-    for vertex in hn.hypernetwork:
+    # Collect first, deleting while walking the Hn changes it underneath us.
+    outliers = {}
+
+    for vertex in hn.query(N="^" + re.escape(N) + "$"):
         hs = hn.hypernetwork[vertex]
 
-        if hs.N == N:
-            if len(hs.simplex) > smallest_nary:
-                for s in hs.simplex:
-                    if len(hn.hypernetwork[s].partOf) == 1:
-                        hn.delete(vertex=s)
+        if len(hs.simplex) > smallest_nary:
+            for s in hs.simplex:
+                s = remove_special(s)
+                if s in hn.hypernetwork and len(hn.hypernetwork[s].partOf_ids) == 1:
+                    outliers[s] = None
+
+    hn.delete_many(list(outliers))
 
 
 def find_in(val, simplex):
@@ -61,8 +72,9 @@ def condense_all_specials(simplex):
     res = []
     for vertex in simplex:
         if isinstance(vertex, dict):
-            key = list(vertex.keys())[0]
-            res.append(key + "@" + vertex[key])
+            entry = split_special(vertex)
+            if entry:
+                res.append(special_name(*entry))
 
         else:
             res.append(vertex)
@@ -75,7 +87,7 @@ def remove_special(vert):
 
 
 def is_special(vert):
-    return vert[:4] in ["SEQ@", "IMM@", "MAN@"]
+    return vert[:4] in SPECIALS
 
 
 def get_vertex_types(hn, *vertices):
@@ -0,0 +1,109 @@
+# Iterative traversal of a Hypernetwork.
+#   Traversals go down through the simplex of each Hs or up through its partOf, using an
+#   explicit stack or queue rather than recursion, so the depth of a Hn is not limited by
+#   Python's recursion limit.  Each Hs is visited once, shared sub-Hns are not revisited.
+from collections import deque
+
+UP = 1
+DOWN = -1
+
+
+def _following(hs, direction):
+    return hs.parts if direction == DOWN else hs.wholes
+
+
+def traverse(hypernetwork, start, direction=DOWN, breadth_first=False, postorder=False, visited=None):
+    # A generator of the Hs reachable from start, a vertex or list of vertices, in the
+    #   dict of a Hn.  Depth first in preorder unless postorder or breadth_first are set,
+    #   vertices missing from the dict are skipped.  A visited set can be shared between
+    #   traversals so that they do not overlap.
+    if isinstance(start, str):
+        start = [start]
+
+    if visited is None:
+        visited = set()
+
+    if breadth_first:
+        queue = deque()
+
+        for vertex in start:
+            if vertex in hypernetwork and vertex not in visited:
+                visited.add(vertex)
+                queue.append(vertex)
+
+        while queue:
+            hs = hypernetwork[queue.popleft()]
+            yield hs
+
+            for vertex in _following(hs, direction):
+                if vertex in hypernetwork and vertex not in visited:
+                    visited.add(vertex)
+                    queue.append(vertex)
+
+        return
+
+    for root in start:
+        if root not in hypernetwork or root in visited:
+            continue
+
+        visited.add(root)
+        hs = hypernetwork[root]
+        if not postorder:
+            yield hs
+
+        work = [(hs, iter(_following(hs, direction)))]
+
+        while work:
+            hs, following = work[-1]
+
+            for vertex in following:
+                if vertex in hypernetwork and vertex not in visited:
+                    visited.add(vertex)
+                    child = hypernetwork[vertex]
+                    if not postorder:
+                        yield child
+
+                    work.append((child, iter(_following(child, direction))))
+                    break
+
+            else:
+                work.pop()
+                if postorder:
+                    yield hs
+
+
+def paths(hypernetwork, start, to_vertex="", direction=UP, prune=None):
+    # A generator of every path from start to to_vertex, or when not given to the peaks
+    #   going up or to the leaves going down.  A path never visits a vertex twice, and
+    #   stops at any Hs for which prune is True.
+    path = []
+    on_path = set()
+    work = []
+    vertex = start
+
+    while True:
+        if vertex is not None:
+            hs = hypernetwork[vertex]
+            following = _following(hs, direction)
+
+            if hs.vertex == to_vertex or (not to_vertex and not following):
+                yield path + [vertex]
+
+            elif not (prune and prune(hs)):
+                path.append(vertex)
+                on_path.add(vertex)
+                work.append(iter(following))
+
+            vertex = None
+
+        if not work:
+            return
+
+        for _vertex in work[-1]:
+            if _vertex in hypernetwork and _vertex not in on_path:
+                vertex = _vertex
+                break
+
+        else:
+            work.pop()
+            on_path.discard(path.pop())
@@ -49,10 +49,11 @@ def from_RDF(g):
             else:
                 beta.update({o: [s]})
 
-    for vertex, simplex in alpha.items():
-        hn.insert(vertex=vertex, hstype=ALPHA, simplex=simplex)
+    with hn.batch():
+        for vertex, simplex in alpha.items():
+            hn.insert(vertex=vertex, hstype=ALPHA, simplex=simplex)
 
-    for vertex, simplex in beta.items():
-        hn.insert(vertex=vertex, hstype=BETA, simplex=simplex)
+        for vertex, simplex in beta.items():
+            hn.insert(vertex=vertex, hstype=BETA, simplex=simplex)
 
     return hn
@@ -7,7 +7,10 @@ __all__ = ["HTAlgebra",
            "HTLaTex",
            "HTMongo",
            "HTTools",
+           "HTTraverse",
            "HTGraph",
            "HTLambda",
+           "HTMemory",
            "HTPaths.py",
+           "HTPartition",
            "HTWebOnt"]
\ No newline at end of file
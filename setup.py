@@ -1,5 +1,6 @@
 from setuptools import setup, command
 import os
+import re
 import shutil
 
 
@@ -12,6 +13,11 @@ def reqs(*f):
         os.path.join(os.getcwd(), *f)).readlines()]))
 
 
+def version(*f):
+    # The version is kept in the package, as __version__.
+    return re.search(r'^__version__ = "(.+)"$', open(os.path.join(os.getcwd(), *f)).read(), re.M).group(1)
+
+
 class py_install(command.install_scripts.install_scripts):
     def run(self):
         command.install_scripts.install_scripts.run(self)
@@ -23,7 +29,7 @@ class py_install(command.install_scripts.install_scripts):
 setup(
     name='hypernetworks',
     author='Richard Charlesworth',
-    version='0.0.7',
+    version=version('hypernetworks', '__init__.py'),
     license="MIT",
     url='https://github.com/rdchar/HypernetworkTheory',
     description='Hypernetwork Theory library.',
@@ -35,7 +41,7 @@ setup(
     packages=['hypernetworks', 'hypernetworks/core', 'hypernetworks/utils'],
     cmdclass={"install_scripts": py_install},
     scripts=['hypernetworks/bin/hnLoader.py', 'hypernetworks/bin/hnServer.py'],
-    package_data={'': ['fullHT.lark']},
+    package_data={'': ['fullHT.lark', 'fullHT.parser']},
     include_package_data=True,
     zip_safe=False
     # ...